@@ -0,0 +1,147 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=broad-exception-caught
+# pylint: disable=wrong-import-position
+import os
+import io
+import sys
+import json
+import time
+import fnmatch
+import argparse
+import platform
+import tempfile
+import statistics
+from contextlib import redirect_stdout
+
+# no display needed, must be set before anything creates a Qt application
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtGui import QGuiApplication
+
+from benchmarks.suite import BENCHMARKS, Workspace
+from version import __version__
+
+# default place for results files, kept out of git
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def measure(func, repeat):
+    """
+    Args:
+        func (callable): Code to time.
+        repeat (int): Number of timed runs, after one warm-up run.
+
+    Returns:
+        dict: Timings of the runs, in seconds.
+    """
+    with redirect_stdout(io.StringIO()):
+        func()
+
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            runs.append(time.perf_counter() - start)
+
+    return {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.fmean(runs),
+        "runs": runs,
+    }
+
+
+def compare(results, baseline_path):
+    """
+    Prints how the medians changed against an earlier results file.
+
+    Args:
+        results (dict): Results of this run.
+        baseline_path (str): JSON file written by an earlier run.
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    print(f"\nagainst {baseline['version']}:")
+    for name, timing in results.items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+
+        ratio = timing["median"] / old["median"]
+        flag = "  <-- slower" if ratio > 1.1 else ""
+        print(f"  {name:<24} {ratio:6.2f}x{flag}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="benchmarks", description="Times the hot paths on synthetic WADs."
+    )
+    parser.add_argument("-n", "--lumps", type=int, default=256, help="lumps per WAD")
+    parser.add_argument("-s", "--size", type=int, default=128, help="texture size")
+    parser.add_argument("--images", type=int, default=64, help="images to import")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="timed runs")
+    parser.add_argument(
+        "-k", "--only", default="*", help="glob of the benchmarks to run"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="results file (default: benchmarks/results/bench-VERSION.json)",
+    )
+    parser.add_argument("--compare", help="results file of an earlier run")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+
+    names = [n for n in BENCHMARKS if fnmatch.fnmatch(n, args.only)]
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix="qthon-bench-") as root:
+        workspace = Workspace(root, args.lumps, args.size, args.images)
+
+        for name in names:
+            try:
+                results[name] = measure(BENCHMARKS[name](workspace), args.repeat)
+            except Exception as e:
+                print(f"{name:<24} failed: {e}")
+                continue
+
+            print(f"{name:<24} {results[name]['median'] * 1000:10.1f} ms")
+
+    report = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "time": time.time(),
+        "params": {
+            "lumps": args.lumps,
+            "size": args.size,
+            "images": args.images,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"bench-{__version__}.json")
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    app.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=import-outside-toplevel
+import os
+
+from benchmarks.synthetic import make_wad, make_images
+from utils.history import History
+from utils.texture_store import TextureStore
+from utils.wad import unwad, wadup, wadup_hl, import_texture, defullbright, flip_texture
+
+# name -> setup function, in definition order
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    """
+    Registers a benchmark. The function gets the Workspace and does its
+    setup, then returns the callable that's actually timed.
+    """
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+class Workspace:
+    """
+    Synthetic inputs shared by every benchmark of a run, generated once.
+    """
+
+    def __init__(self, root, lumps=256, size=128, images=64):
+        """
+        Args:
+            root (str): Directory to generate the inputs and write outputs in.
+            lumps (int, optional): Lumps per WAD.
+            size (int, optional): Width and height of the textures.
+            images (int, optional): Number of images to import.
+        """
+        self.root = root
+        self.lumps = lumps
+        self.size = size
+
+        self.wad2 = make_wad(os.path.join(root, "bench2.wad"), lumps, size)
+        self.wad3 = make_wad(os.path.join(root, "bench3.wad"), lumps, size, True)
+        self.images = make_images(os.path.join(root, "images"), images, size)
+
+    def path(self, name):
+        """Returns the path of an output file in the workspace."""
+        return os.path.join(self.root, name)
+
+
+# # # # # # # # # # # #
+# WAD
+# # # # # # # # # # # #
+
+
+@benchmark
+def unwad_lazy(ws):
+    return lambda: unwad(ws.wad2, lazy=True)
+
+
+@benchmark
+def unwad_wad2(ws):
+    return lambda: unwad(ws.wad2)
+
+
+@benchmark
+def unwad_wad3(ws):
+    return lambda: unwad(ws.wad3)
+
+
+@benchmark
+def wadup_copy(ws):
+    """Saves textures that didn't change, lumps are copied as they are."""
+    textures = unwad(ws.wad2, lazy=True)
+    return lambda: wadup(textures, ws.path("copy.wad"))
+
+
+@benchmark
+def wadup_encode(ws):
+    """Saves WAD3 textures to WAD2, every one gets quantized to the Quake palette."""
+    textures = unwad(ws.wad3)
+    return lambda: wadup(textures, ws.path("encode2.wad"))
+
+
+@benchmark
+def wadup_hl_encode(ws):
+    textures = unwad(ws.wad2)
+    return lambda: wadup_hl(textures, ws.path("encode3.wad"))
+
+
+@benchmark
+def import_images(ws):
+    return lambda: import_texture(ws.images)
+
+
+@benchmark
+def defullbright_wad2(ws):
+    textures = unwad(ws.wad2)
+    return lambda: defullbright(textures)
+
+
+# # # # # # # # # # # #
+# HISTORY
+# # # # # # # # # # # #
+
+
+def _history(ws):
+    store = TextureStore()
+    for texture in unwad(ws.wad2):
+        store.add(texture)
+
+    history = History()
+    history.set_store(store)
+    return store, history
+
+
+def _state(store):
+    return [{"title": name, "texture": store[name]} for name in store]
+
+
+@benchmark
+def history_new_change(ws):
+    """Records 20 states, each with one texture changed."""
+    store, _ = _history(ws)
+    names = list(store)[:20]
+
+    def run():
+        history = History()
+        history.set_store(store)
+        history.new_change(_state(store))
+        for name in names:
+            original = store[name]
+            store[name] = flip_texture(original)
+            history.new_change(_state(store))
+            store[name] = original
+
+    return run
+
+
+@benchmark
+def history_load_snapshot(ws):
+    """Jumps back and forth between the first and last of 20 states."""
+    store, history = _history(ws)
+    history.new_change(_state(store))
+    for name in list(store)[:20]:
+        store[name] = flip_texture(store[name])
+        history.new_change(_state(store))
+
+    first, last = str(history.state[1]["time"]), str(history.state[-1]["time"])
+
+    def run():
+        for _ in range(10):
+            history.load_snapshot(first)
+            history.load_snapshot(last)
+
+    return run
+
+
+# # # # # # # # # # # #
+# THUMBNAILS
+# # # # # # # # # # # #
+
+
+@benchmark
+def thumbnails_render(ws):
+    """Renders a 64px thumbnail of every texture on the calling thread."""
+    from utils.thumbnails import texture_image, scaled_thumbnail
+
+    textures = unwad(ws.wad2)
+    return lambda: [scaled_thumbnail(texture_image(t), 64) for t in textures]
+
+
+@benchmark
+def thumbnails_service(ws):
+    """Renders the pyramid levels around 64px of every texture on the thread pool."""
+    from PyQt5.QtCore import QCoreApplication
+    from utils.thumbnails import ThumbnailService
+
+    textures = unwad(ws.wad2)
+
+    def run():
+        service = ThumbnailService()
+        for texture in textures:
+            service.get(texture, 64)
+
+        while service.pending:
+            service.pool.waitForDone(10)
+            QCoreApplication.processEvents()
+
+        service.shutdown()
+
+    return run
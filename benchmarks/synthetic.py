@@ -0,0 +1,75 @@
+# pylint: disable=missing-module-docstring
+import os
+
+import numpy as np
+from PIL import Image
+
+from utils.wadwriter import WadWriter, miptex_lump
+
+
+def make_wad(path, lumps=256, size=128, wad3=False, seed=0):
+    """
+    Writes a WAD of random MIPTEX lumps. The last one has a name that isn't
+    ASCII, like some old WADs do, so saving copied lumps covers those too.
+
+    Args:
+        path (str): Output path.
+        lumps (int, optional): Number of lumps.
+        size (int, optional): Width and height of every texture.
+        wad3 (bool, optional): Whether to write a WAD3 file, with a random
+            palette per texture, instead of a WAD2 file.
+        seed (int, optional): Seed of the random pixels.
+
+    Returns:
+        str: The output path.
+    """
+    rng = np.random.default_rng(seed)
+
+    with WadWriter(path, wad3) as wad_file:
+        for i in range(lumps):
+            # blocks of colour rather than noise, closer to real textures
+            block = rng.integers(0, 256, (size // 8, size // 8), np.uint8)
+            pixels = np.kron(block, np.ones((8, 8), np.uint8))
+
+            levels = [
+                pixels[:: 1 << level, :: 1 << level].tobytes() for level in range(4)
+            ]
+            palette = rng.integers(0, 256, 768, np.uint8).tobytes() if wad3 else None
+
+            name = f"bench{i:05d}"
+            lump = miptex_lump(name, size, size, levels, palette)
+
+            if i == lumps - 1:
+                name = name.encode("ascii") + b"\xe9"
+            wad_file.add(name, lump)
+
+    return path
+
+
+def make_images(out_dir, count=64, size=128, seed=0):
+    """
+    Writes random PNG images, every fourth one with an alpha channel.
+
+    Args:
+        out_dir (str): Output directory.
+        count (int, optional): Number of images.
+        size (int, optional): Width and height of every image.
+        seed (int, optional): Seed of the random pixels.
+
+    Returns:
+        list: Paths of the written images.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+
+    paths = []
+    for i in range(count):
+        channels = 4 if i % 4 == 0 else 3
+        block = rng.integers(0, 256, (size // 8, size // 8, channels), np.uint8)
+        pixels = block.repeat(8, axis=0).repeat(8, axis=1)
+
+        path = os.path.join(out_dir, f"image{i:05d}.png")
+        Image.fromarray(pixels, "RGBA" if channels == 4 else "RGB").save(path)
+        paths.append(path)
+
+    return paths
@@ -9,6 +9,7 @@
 # pylint: disable=unnecessary-lambda
 
 import sys, os, tempfile
+from multiprocessing import freeze_support
 import assets.ui.resource_ui
 from logging import error
 from shutil import rmtree
@@ -17,21 +18,31 @@ from PyQt5 import uic, QtGui, QtCore
 from PyQt5.QtWidgets import (
     QMainWindow,
     QApplication,
-    QListWidgetItem,
     QLineEdit,
     QWidget,
     QSizePolicy,
     QMenu,
     QMessageBox,
+    QProgressBar,
+    QPushButton,
 )
 
-from utils import history, settings, path
-from utils.wad import get_texture_size
+from utils import history, settings, path, pool
+from utils.jobs import JobRunner
+from utils.profiling import timed
+from utils.texture_store import TextureStore
+from utils.thumbnails import ThumbnailService
+from utils.texture_model import (
+    TextureListModel,
+    TextureFilterModel,
+    TextureDelegate,
+)
 from menus.file import FileMixin
 from menus.edit import EditMixin
 from menus.view import ViewMixin
 
 from windows.AboutWindow import AboutWindow
+from windows.PerformanceWindow import PerformanceWindow
 
 try:
     from version_build import __version__
@@ -52,9 +63,12 @@ class MainWindow(QMainWindow, FileMixin, EditMixin, ViewMixin):
         self.texture_spacing = 17
         self.undo_limit = 0  # 0 means no limit
         self.water_port = 9742
+        self.workers = 0  # 0 means one per CPU core
+        self.thumbnail_cache_mb = 64
         self.history = None
         self.settings = settings.Config()
-        self.temp_dir = None
+        self.temp_dir = None  # made on first use, see get_temp_dir
+        self.textures = TextureStore()
         self.save_pos = None
         self.user_data_dir = user_data_dir("qthon")
         self.clipboard_temp_dir = tempfile.mkdtemp(prefix="tmp-qtwaditor-clipboard-")
@@ -67,6 +81,40 @@ class MainWindow(QMainWindow, FileMixin, EditMixin, ViewMixin):
 
         self.load_config()
         self.history = history.History(self.undo_limit)
+        self.history.set_store(self.textures)
+        self.thumbnails = ThumbnailService(self.thumbnail_cache_mb * 1024 * 1024, self)
+
+        # the list only keeps texture names, icons are painted for visible rows
+        self.texture_model = TextureListModel(
+            self.textures, self.thumbnails, self.texture_size, self
+        )
+        self.filter_model = TextureFilterModel(self)
+        self.filter_model.setSourceModel(self.texture_model)
+        self.lw_textures.setModel(self.filter_model)
+        self.lw_textures.setItemDelegate(TextureDelegate(self.lw_textures))
+        self.lw_textures.setIconSize(QtCore.QSize(self.texture_size, self.texture_size))
+
+        # opening, importing and saving run in the background, with their
+        # progress and a cancel button in the status bar
+        self.jobs = JobRunner(self)
+        self.job_progress = QProgressBar(self)
+        self.job_progress.setMaximumWidth(260)
+        self.job_progress.hide()
+        self.job_cancel = QPushButton("Cancel", self)
+        self.job_cancel.hide()
+        self.statusbar.addPermanentWidget(self.job_progress)
+        self.statusbar.addPermanentWidget(self.job_cancel)
+
+        self.jobs.progress.connect(self.show_job_progress)
+        self.jobs.failed.connect(
+            lambda label, message: QMessageBox.warning(
+                self, "Qthon Warning", f"{label} failed: {message}"
+            )
+        )
+        self.jobs.busy.connect(self.job_progress.setVisible)
+        self.jobs.busy.connect(self.job_cancel.setVisible)
+        self.jobs.changed.connect(self.update_save_actions)
+        self.job_cancel.clicked.connect(lambda: self.jobs.cancel())
 
         self.new_wad()
         self.set_search()
@@ -116,6 +164,9 @@ class MainWindow(QMainWindow, FileMixin, EditMixin, ViewMixin):
                 QtCore.QUrl("https://tunalad.github.io/projects/qthon/")
             )
         )
+        self.actionPerformance.triggered.connect(
+            lambda: PerformanceWindow(self).exec_()
+        )
         self.actionPreferences.triggered.connect(lambda: self.preferences_handling())
         self.actionQuit.triggered.connect(lambda: self.close())
 
@@ -191,6 +242,12 @@ class MainWindow(QMainWindow, FileMixin, EditMixin, ViewMixin):
             )
         )
 
+        # thumbnails are only rendered for rows that get painted
+        self.lw_textures.verticalScrollBar().valueChanged.connect(
+            lambda: self.thumbnails.cancel()
+        )
+        self.thumbnails.ready.connect(lambda: self.lw_textures.viewport().update())
+
         self.lw_textures.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
         self.lw_textures.customContextMenuRequested.connect(
             lambda pos: self.right_click_menu(pos)
@@ -199,21 +256,25 @@ class MainWindow(QMainWindow, FileMixin, EditMixin, ViewMixin):
         self.open_recent()
 
         ### togglable items when we selected EXACTLY 1 item
-        self.lw_textures.itemSelectionChanged.connect(
+        self.lw_textures.selectionModel().selectionChanged.connect(
             lambda: self.active_on_selection(togglable_actions, False)
         )
 
         ### togglable items when we selected LESS than 1 item
-        self.lw_textures.itemSelectionChanged.connect(
+        self.lw_textures.selectionModel().selectionChanged.connect(
             lambda: self.active_on_selection(togglable_actions_lto, True)
         )
 
         ### disable detailed & animation preview
         self.disable_previews()
-        self.lw_textures.itemSelectionChanged.connect(lambda: self.disable_previews())
+        self.lw_textures.selectionModel().selectionChanged.connect(
+            lambda: self.disable_previews()
+        )
 
         # toggle statusbar info
-        self.lw_textures.itemSelectionChanged.connect(lambda: self.statusbar_text())
+        self.lw_textures.selectionModel().selectionChanged.connect(
+            lambda: self.statusbar_text()
+        )
 
         # TOGGLING BARS
         self.bars_manager(self.statusbar, self.actionHide_statusbar)
@@ -270,7 +331,13 @@ class MainWindow(QMainWindow, FileMixin, EditMixin, ViewMixin):
 
     def closeEvent(self, event):
         try:
-            rmtree(self.temp_dir)
+            # saves are left to finish, nothing else is worth waiting for
+            self.jobs.cancel(("open", "import", "export", "edit"))
+            self.jobs.wait()
+            self.thumbnails.shutdown()
+            pool.shutdown()
+            if self.temp_dir:
+                rmtree(self.temp_dir)
             rmtree(self.clipboard_temp_dir)
         except Exception as e:
             error(f"[closeEvent] {e}")
@@ -296,6 +363,8 @@ class MainWindow(QMainWindow, FileMixin, EditMixin, ViewMixin):
             self.texture_size = cfg["default_zoom"]
             self.undo_limit = cfg["undo_limit"]
             self.water_port = cfg["water_port"]
+            self.workers = cfg.get("workers", 0)
+            self.thumbnail_cache_mb = cfg.get("thumbnail_cache_mb", 64)
 
             self.actionHide_statusbar.setChecked(cfg["hide_item"]["statusbar"])
             self.actionHide_toolbar.setChecked(cfg["hide_item"]["toolbar"])
@@ -337,11 +406,7 @@ class MainWindow(QMainWindow, FileMixin, EditMixin, ViewMixin):
 
     def fzf_textures(self):
         try:
-            search_text = self.search_bar.text().lower()
-            for index in range(self.lw_textures.count()):
-                item = self.lw_textures.item(index)
-                item_text = item.text().lower()
-                item.setHidden(search_text not in item_text)
+            self.filter_model.set_query(self.search_bar.text())
         except Exception as e:
             error(f"[fzf_textures] {e}")
 
@@ -369,6 +434,7 @@ class MainWindow(QMainWindow, FileMixin, EditMixin, ViewMixin):
             else:
                 return
 
+            self.texture_model.set_icon_size(self.texture_size)
             self.lw_textures.setIconSize(
                 QtCore.QSize(self.texture_size, self.texture_size)
             )
@@ -390,18 +456,17 @@ class MainWindow(QMainWindow, FileMixin, EditMixin, ViewMixin):
 
     def disable_previews(self):
         try:
-            selected_items = self.lw_textures.selectedItems()
+            selected_names = self.selected_names()
 
             # disable detailed
-            if len(selected_items) != 1:
+            if len(selected_names) != 1:
                 self.actionView_Detailed.setEnabled(False)
             else:
                 self.actionView_Detailed.setEnabled(True)
 
             # disable animation
-            if len(selected_items) != 1 or not (
-                selected_items[0].text().startswith("+")
-                or selected_items[0].text().startswith("*")
+            if len(selected_names) != 1 or not (
+                selected_names[0].startswith("+") or selected_names[0].startswith("*")
             ):
                 self.actionView_Animated.setEnabled(False)
             else:
@@ -411,73 +476,97 @@ class MainWindow(QMainWindow, FileMixin, EditMixin, ViewMixin):
 
     def statusbar_text(self):
         try:
-            selected_items = self.lw_textures.selectedItems()
+            selected_names = self.selected_names()
             game_text = f"Game: {self.wad_game}" if self.wad_path else "No WAD open"
 
-            if len(selected_items) < 1:
+            if len(selected_names) < 1:
                 self.statusbar.showMessage(game_text)
                 return
 
-            if len(selected_items) > 1:
+            if len(selected_names) > 1:
                 self.statusbar.showMessage(
-                    f"{game_text} | Selected: {len(selected_items)}/{self.lw_textures.count()}"
+                    f"{game_text} | Selected: {len(selected_names)}/{self.texture_model.rowCount()}"
                 )
             else:
-                texture = selected_items[0]
+                info = self.textures[selected_names[0]].info
                 self.statusbar.showMessage(
-                    f"{game_text} | {texture.text()} | {get_texture_size(texture.data(QtCore.Qt.UserRole))}"
+                    f"{game_text} | {selected_names[0]} | {info.width}x{info.height}"
+                    f" | {info.lump_type} | {info.palette} palette | {info.lump_size} bytes"
                 )
         except Exception as e:
             error(f"[statusbar_text] {e}")
 
-    def get_list_state(self):
+    def update_save_actions(self):
         try:
-            textures = self.lw_textures
-            state = []
-            for i in range(textures.count()):
-                item = textures.item(i)
-                state.append(
-                    {
-                        "title": item.text(),
-                        "path": item.data(QtCore.Qt.UserRole),
-                    }
-                )
+            # saving while textures are still coming in would write part of them
+            enabled = not self.jobs.active(("open", "import"))
+            for action in (
+                self.actionSave,
+                self.actionSave_As,
+                self.actionSave_Selections_As,
+                self.actionExport_Images,
+                self.actionExport_Selected_Images,
+            ):
+                action.setEnabled(enabled)
+        except Exception as e:
+            error(f"[update_save_actions] {e}")
 
-            return state
+    def show_job_progress(self, label, done, total):
+        try:
+            # a 0 to 0 range shows a busy indicator until the total is known
+            self.job_progress.setRange(0, total)
+            self.job_progress.setValue(done)
+            self.job_progress.setFormat(f"{label} %v/%m" if total else label)
+        except Exception as e:
+            error(f"[show_job_progress] {e}")
+
+    def get_temp_dir(self):
+        # only pasted images and liquid previews need files, so opening a WAD doesn't
+        if not self.temp_dir:
+            self.temp_dir = tempfile.mkdtemp(prefix="tmp-qtwaditor-")
+
+        return self.temp_dir
+
+    def get_list_state(self):
+        try:
+            return [
+                {"title": name, "texture": self.textures[name]}
+                for name in self.texture_model.names
+            ]
         except Exception as e:
             error(f"[get_list_state] {e}")
             return e
 
+    @timed("main.set_list_state")
     def set_list_state(self):
         try:
-            # clear list
-            self.lw_textures.clear()
             self.history.load_snapshot(
                 str(self.history.state[self.history.position - 1]["time"])
             )
-            # append items based on state
-            textures = self.history.state[self.history.position - 1]["list-state"]
-            for t in textures:
-                scaled_pixmap = QtGui.QPixmap(f"{t['path']}").scaled(
-                    self.texture_size, self.texture_size, QtCore.Qt.KeepAspectRatio
-                )
-
-                scaled_icon = QtGui.QIcon(scaled_pixmap)
-                item = QListWidgetItem(scaled_icon, t["title"])
-
-                item.setData(QtCore.Qt.UserRole, t["path"])
-                item.setIcon(QtGui.QIcon(scaled_pixmap))
-
-                self.lw_textures.addItem(item)
+            self.texture_model.set_names(
+                [
+                    t["title"]
+                    for t in self.history.state[self.history.position - 1]["list-state"]
+                ]
+            )
         except Exception as e:
             error(f"[set_list_state] {e}")
 
+    def selected_rows(self):
+        return sorted(
+            self.filter_model.mapToSource(i).row()
+            for i in self.lw_textures.selectionModel().selectedRows()
+        )
+
+    def selected_names(self):
+        return [self.texture_model.name(row) for row in self.selected_rows()]
+
     def active_on_selection(self, actions, multi=False):
         try:
             for a in actions:
-                if not multi and len(self.lw_textures.selectedItems()) == 1:
+                if not multi and len(self.selected_rows()) == 1:
                     a.setEnabled(True)
-                elif multi and len(self.lw_textures.selectedItems()) > 0:
+                elif multi and len(self.selected_rows()) > 0:
                     a.setEnabled(True)
                 else:
                     a.setEnabled(False)
@@ -486,6 +575,7 @@ class MainWindow(QMainWindow, FileMixin, EditMixin, ViewMixin):
 
 
 if __name__ == "__main__":
+    freeze_support()  # worker processes of the frozen binary
     app = QApplication(sys.argv)
     UIWindow = MainWindow()
     app.exec_()
@@ -4,27 +4,47 @@
 # pylint: disable=unnecessary-lambda
 import os
 from logging import error
-from shutil import rmtree, copyfile
+from shutil import rmtree
+from functools import partial
 from PyQt5 import QtGui, QtCore
 from PyQt5.QtWidgets import (
     QApplication,
-    QListWidgetItem,
     QMessageBox,
 )
 
 from utils.wad import (
-    flip_texture,
-    rotate_texture,
+    flip_textures,
+    rotate_textures,
     defullbright,
 )
 
 from utils import settings
+from utils.jobs import Job
+from utils.resize import iter_resize
 
 from windows.RenameWindow import RenameWindow
 from windows.ResizeWindow import ResizeWindow
 from windows.DfbWindow import DfbWindow
 
 
+def _resize(job, textures, sizes, filter_name, workers):
+    """
+    Resizes textures on the process pool, returns (original, resized) pairs of
+    the textures whose size changed.
+    """
+    # textures come back pickled, the ones keeping their size aren't sent at all
+    changed = [(t, tuple(s)) for t, s in zip(textures, sizes) if tuple(s) != t.size]
+    textures = [t for t, _ in changed]
+    sizes = [s for _, s in changed]
+
+    resized = []
+    for chunk in iter_resize(textures, sizes, filter_name, workers):
+        resized += chunk
+        job.report(len(resized), len(textures))
+
+    return list(zip(textures, resized))
+
+
 class EditMixin:
     """
     Mixin class providing edit functionality for texture manipulation.
@@ -57,26 +77,19 @@ class EditMixin:
         try:
             clipboard = QApplication.clipboard()
             mime_data = QtCore.QMimeData()
-            image_paths = []
-
-            selected_items = self.lw_textures.selectedItems()
+            selected_rows = self.selected_rows()
+            texture_names = [self.texture_model.name(row) for row in selected_rows]
 
             rmtree(self.clipboard_temp_dir)
             os.makedirs(self.clipboard_temp_dir, exist_ok=True)
 
-            for item in selected_items:
-                image_paths.append(item.data(QtCore.Qt.UserRole))
-
-            if image_paths:
+            if texture_names:
                 # initialize an empty list to hold all URLs
                 urls_to_copy = []
-                for image_path in image_paths:
-                    # move the image to the clipboard folder
-                    new_path = os.path.join(
-                        self.clipboard_temp_dir, os.path.basename(image_path)
-                    )
-                    copyfile(image_path, new_path)
-
+                # write the images to the clipboard folder
+                for new_path in self.textures.export(
+                    texture_names, self.clipboard_temp_dir
+                ):
                     # add the new path as a URL to the urls_to_copy list
                     urls_to_copy.append(QtCore.QUrl.fromLocalFile(new_path))
 
@@ -85,9 +98,9 @@ class EditMixin:
                 clipboard.setMimeData(mime_data)
 
                 if is_cut:
-                    for item in selected_items:
-                        self.lw_textures.takeItem(self.lw_textures.row(item))
-                        os.remove(item.data(QtCore.Qt.UserRole))
+                    self.texture_model.remove(selected_rows)
+                    for name in texture_names:
+                        self.textures.remove(name)
 
                     self.history.new_change(self.get_list_state())
 
@@ -110,7 +123,7 @@ class EditMixin:
                 pixmap = QtGui.QPixmap()
                 pixmap.loadFromData(image_data, "PNG")
 
-                pasted_dir = os.path.join(self.temp_dir, "pasted")
+                pasted_dir = os.path.join(self.get_temp_dir(), "pasted")
                 os.makedirs(pasted_dir, exist_ok=True)
                 temp_file_path = os.path.join(pasted_dir, "pasted_image.png")
                 pixmap.save(temp_file_path, "PNG")
@@ -133,13 +146,13 @@ class EditMixin:
             error(f"[paste_item] Error: {e}")
 
     def delete_textures(self):
-        """Removes selected textures from list and deletes corresponding files."""
+        """Removes selected textures from list and from the texture store."""
         try:
             print("we deleting stuff")
-            textures = self.lw_textures.selectedItems()
-            for t in textures:
-                self.lw_textures.takeItem(self.lw_textures.row(t))
-                os.remove(t.data(QtCore.Qt.UserRole))
+            selected_rows = self.selected_rows()
+            for name in [self.texture_model.name(row) for row in selected_rows]:
+                self.textures.remove(name)
+            self.texture_model.remove(selected_rows)
 
             self.history.new_change(self.get_list_state())
         except Exception as e:
@@ -153,8 +166,10 @@ class EditMixin:
             toggle (bool): If True, selects all. If False, deselects all.
         """
         try:
-            for i in range(self.lw_textures.count()):
-                self.lw_textures.item(i).setSelected(toggle)
+            if toggle:
+                self.lw_textures.selectAll()
+            else:
+                self.lw_textures.clearSelection()
         except Exception as e:
             error(f"[de_select_all] {e}")
 
@@ -171,7 +186,7 @@ class EditMixin:
             if descending:
                 sort_order = QtCore.Qt.DescendingOrder
 
-            self.lw_textures.sortItems(sort_order)
+            self.texture_model.sort(0, sort_order)
 
             self.history.new_change(self.get_list_state())
         except Exception as e:
@@ -185,27 +200,25 @@ class EditMixin:
             to_right (bool): If True, rotates clockwise. If False, counterclockwise.
         """
         try:
-            selected_items = self.lw_textures.selectedItems()
+            selected_rows = self.selected_rows()
 
-            if len(selected_items) < 1:
+            if len(selected_rows) < 1:
                 print("nothing is selected buckoo")
                 return
 
-            for item in selected_items:
-                icon_path = item.data(QtCore.Qt.UserRole)
-
-                if to_right:  # rotate to right
-                    rotate_texture(icon_path, True)
-                else:  # to left
-                    rotate_texture(icon_path, False)
+            names = [self.texture_model.name(row) for row in selected_rows]
+            textures = [self.textures[name] for name in names]
+            rotation = QtGui.QTransform().rotate(90 if to_right else -90)
 
-                original_pixmap = QtGui.QPixmap(icon_path)
-                scaled_pixmap = original_pixmap.scaled(
-                    self.texture_size, self.texture_size, QtCore.Qt.KeepAspectRatio
+            for name, texture, rotated in zip(
+                names, textures, rotate_textures(textures, to_right)
+            ):
+                self.thumbnails.transform(
+                    texture, rotated, lambda image: image.transformed(rotation)
                 )
+                self.textures[name] = rotated
 
-                item.setIcon(QtGui.QIcon(scaled_pixmap))
-                item.setData(QtCore.Qt.UserRole, icon_path)
+            self.texture_model.refresh(selected_rows)
 
             self.history.new_change(self.get_list_state())
         except Exception as e:
@@ -214,10 +227,10 @@ class EditMixin:
     def defullbright_textures(self):
         """Creates non-fullbright versions of selected textures."""
         try:
-            textures = []
-
-            for i in self.lw_textures.selectedItems():
-                textures.append(i.data(QtCore.Qt.UserRole))
+            selected_rows = self.selected_rows()
+            textures = [
+                self.textures[self.texture_model.name(r)] for r in selected_rows
+            ]
 
             dfb_settings = settings.Config().parsed_cfg["defullbright"]
 
@@ -230,19 +243,12 @@ class EditMixin:
 
             dfb_textures = defullbright(textures, dfb_settings["overwrite"])
 
-            for t in dfb_textures:
-                filename = os.path.splitext(os.path.basename(t))[0]
-
-                scaled_pixmap = QtGui.QPixmap(t).scaled(
-                    self.texture_size, self.texture_size, QtCore.Qt.KeepAspectRatio
-                )
-
-                scaled_icon = QtGui.QIcon(scaled_pixmap)
-                item = QListWidgetItem(scaled_icon, filename)
-
-                item.setData(QtCore.Qt.UserRole, t)  # icon path
-
-                self.lw_textures.addItem(item)
+            if dfb_settings["overwrite"]:
+                for t in dfb_textures:
+                    self.textures[t.name] = t
+                self.texture_model.refresh(selected_rows)
+            else:
+                self.add_textures(dfb_textures)
 
             self.history.new_change(self.get_list_state())
         except Exception as e:
@@ -251,41 +257,44 @@ class EditMixin:
     def rename_texture(self):
         """Opens dialog to rename single selected texture. Prevents duplicate names."""
         try:
-            selected_items = self.lw_textures.selectedItems()
+            selected_rows = self.selected_rows()
 
-            if len(selected_items) != 1:
+            if len(selected_rows) != 1:
                 print("can't rename 0 or more than 1 files")
                 QMessageBox.warning(
                     self, "Qthon Error", "Can't rename multiple or no textures."
                 )
                 return
 
-            item = {
-                "title": selected_items[0].text(),
-                "path": selected_items[0].data(QtCore.Qt.UserRole),
-            }
+            row = selected_rows[0]
+            name = self.texture_model.name(row)
 
-            rename_win = RenameWindow(item["title"], item["path"])
+            rename_win = RenameWindow(name, name)
 
             if rename_win.exec_():
                 new_name = rename_win.get_new_name()
-                existing_items = self.lw_textures.findItems(
-                    new_name, QtCore.Qt.MatchExactly
-                )
 
-                if existing_items and existing_items[0] != selected_items[0]:
+                if new_name == name:
+                    return
+
+                if not new_name.isascii():
+                    QMessageBox.warning(
+                        self,
+                        "Qthon Error",
+                        "Texture names can only use ASCII characters.",
+                    )
+                    return
+
+                if new_name in self.textures:
                     print("item already exists bucko")
                     QMessageBox.warning(
                         self, "Qthon Error", "Texture with this name already exists."
                     )
                     return
 
-                os.rename(item["path"], f"{self.temp_dir}/{new_name}.png")
+                self.textures.rename(name, new_name)
+                self.texture_model.rename(row, new_name)
 
-                selected_items[0].setText(new_name)
-                selected_items[0].setData(
-                    QtCore.Qt.UserRole, f"{self.temp_dir}/{new_name}.png"
-                )
                 self.history.new_change(self.get_list_state())
         except Exception as e:
             error(f"[rename_texture] {e}")
@@ -293,28 +302,61 @@ class EditMixin:
     def resize_texture(self):
         """Opens dialog to resize selected textures."""
         try:
-            selected_items = self.lw_textures.selectedItems()
-            textures = []
+            selected_names = self.selected_names()
 
-            if len(selected_items) < 1:
+            if len(selected_names) < 1:
                 print("can't resize 0 files")
                 QMessageBox.warning(
                     self, "Qthon Error", "No textures selected for resizing"
                 )
                 return
 
-            for i in selected_items:
-                textures.append({"title": i.text(), "path": i.data(QtCore.Qt.UserRole)})
+            textures = [self.textures[name] for name in selected_names]
 
             resize_win = ResizeWindow(textures)
 
             if resize_win.exec_():
-                print("do sth post texture(s) resizing idk")
-                self.history.new_change(self.get_list_state())
-                self.set_list_state()
+                job = Job(
+                    f"Resizing {len(textures)} texture(s)",
+                    partial(
+                        _resize,
+                        textures=textures,
+                        sizes=resize_win.get_sizes(),
+                        filter_name=resize_win.get_filter(),
+                        workers=self.workers,
+                    ),
+                    "edit",
+                )
+                self.jobs.start(job, on_finished=self.resize_done)
         except Exception as e:
             error(f"[resize_texture] {e}")
 
+    def resize_done(self, resized):
+        """
+        Swaps in resized textures once the resize job is done, only touching
+        their rows.
+
+        Args:
+            resized (list): (original, resized) pairs of the textures whose
+                size changed, None if the resize was cancelled.
+        """
+        try:
+            rows = []
+            for original, texture in resized or []:
+                # skip textures that were renamed, removed or edited meanwhile
+                if self.textures.get(original.name) is not original:
+                    continue
+
+                self.textures[original.name] = texture
+                rows.append(self.texture_model.row(original.name))
+
+            if rows:
+                self.texture_model.refresh(rows)
+                self.history.new_change(self.get_list_state())
+                self.statusbar_text()
+        except Exception as e:
+            error(f"[resize_done] {e}")
+
     def flip_texture(self, mirror=False):
         """
         Flips selected textures.
@@ -323,27 +365,25 @@ class EditMixin:
             mirror (bool): If True, flips horizontally. If False, flips vertically.
         """
         try:
-            selected_items = self.lw_textures.selectedItems()
+            selected_rows = self.selected_rows()
 
-            if len(selected_items) < 1:
+            if len(selected_rows) < 1:
                 print("nothing is selected buckoo")
                 return
 
-            for item in selected_items:
-                icon_path = item.data(QtCore.Qt.UserRole)
-
-                if mirror:  # horizontally (mirrored)
-                    flip_texture(icon_path, True)
-                else:  # vertically (flipped)
-                    flip_texture(icon_path, False)
+            names = [self.texture_model.name(row) for row in selected_rows]
+            textures = [self.textures[name] for name in names]
 
-                original_pixmap = QtGui.QPixmap(icon_path)
-                scaled_pixmap = original_pixmap.scaled(
-                    self.texture_size, self.texture_size, QtCore.Qt.KeepAspectRatio
+            for name, texture, flipped in zip(
+                names, textures, flip_textures(textures, mirror)
+            ):
+                # mirror is horizontal, flip is vertical
+                self.thumbnails.transform(
+                    texture, flipped, lambda image: image.mirrored(mirror, not mirror)
                 )
+                self.textures[name] = flipped
 
-                item.setIcon(QtGui.QIcon(scaled_pixmap))
-                item.setData(QtCore.Qt.UserRole, icon_path)
+            self.texture_model.refresh(selected_rows)
 
             self.history.new_change(self.get_list_state())
         except Exception as e:
@@ -2,24 +2,87 @@
 # pylint: disable=multiple-imports
 # pylint: disable=broad-exception-caught
 
-import os, tempfile
-from shutil import rmtree, copyfile
-from PyQt5 import QtGui, QtCore
+import os
+from functools import partial
 from PyQt5.QtWidgets import (
-    QListWidgetItem,
     QFileDialog,
     QMessageBox,
     QAction,
 )
 
+from utils.jobs import Job
+from utils.pool import parallel_imap, worker_count
+from utils.texture_store import TextureStore
 from utils.wad import (
     unwad,
+    iter_unwad,
     wadup,
     wadup_hl,
     import_texture,
     get_wad_type,
 )
-from utils.icon_provider import WadIconProvider
+from utils.icon_provider import WadIconProxy
+
+# textures handed to the list at once while opening a WAD
+BATCH_SIZE = 512
+
+# most images imported per worker task
+IMAGE_CHUNK = 8
+
+
+# # # # # # # # # # # #
+# JOBS, these run off the GUI thread and only talk to it through the job
+# # # # # # # # # # # #
+
+
+def _read_directories(job, wad_paths):
+    """
+    Reads WAD directories, sending lazily decoded textures in batches.
+    Returns True once every WAD was read.
+    """
+    for wad_path in wad_paths:
+        try:
+            textures = unwad(wad_path, lazy=True)
+        except Exception as e:
+            print(f"[unpack_wad] {e}")
+            continue
+
+        for start in range(0, len(textures), BATCH_SIZE):
+            job.send(textures[start : start + BATCH_SIZE])
+            job.report(min(start + BATCH_SIZE, len(textures)), len(textures))
+
+    return True
+
+
+def _decode_wads(job, wad_paths, workers):
+    """Fully decodes WADs on the process pool, sending textures as they're done."""
+    for _, textures, done, total in iter_unwad(wad_paths, workers):
+        job.send(textures)
+        job.report(done, total)
+
+
+def _import_images(job, images, workers):
+    """Imports images on the process pool, sending textures as they're done."""
+    # a few tasks per worker, so small imports still use every core
+    step = max(1, min(IMAGE_CHUNK, len(images) // (worker_count(workers) * 4)))
+    chunks = [images[i : i + step] for i in range(0, len(images), step)]
+
+    done = 0
+    for chunk, textures in zip(chunks, parallel_imap(import_texture, chunks, workers)):
+        done += len(chunk)
+        job.send(textures)
+        job.report(done, len(images))
+
+
+def _save(job, write, textures, out_path, workers):
+    """Writes a WAD, returns True once it's in place."""
+    write(textures, out_path, workers, progress=job.report)
+    return True
+
+
+def _export(job, store, out_dir):
+    """Writes every texture of `store` as a PNG file."""
+    return store.export(list(store), out_dir, progress=job.report)
 
 
 class FileMixin:
@@ -29,18 +92,17 @@ class FileMixin:
 
     def new_wad(self):
         """
-        Creates new empty WAD workspace by clearing temp directory and texture list.
+        Creates new empty WAD workspace by clearing the texture list.
         """
         try:
-            if self.temp_dir:
-                rmtree(self.temp_dir)
-                self.lw_textures.clear()
+            self.settle_jobs()
+            self.thumbnails.clear()
+            self.texture_model.clear()
 
             self.wad_path = None
             self.wad_game = "QUAKE"
 
-            self.temp_dir = tempfile.mkdtemp(prefix="tmp-qtwaditor-")
-            self.history.set_temp_dir(self.temp_dir)
+            self.textures.clear()
             self.history.new_change(self.get_list_state())  # empty snap
             self.statusbar_text()
         except Exception as e:
@@ -109,7 +171,7 @@ class FileMixin:
         try:
             if not wad_path:
                 dialog = QFileDialog(self, "Select a WAD file")
-                dialog.setIconProvider(WadIconProvider())
+                WadIconProxy.attach(dialog)
                 dialog.setFileMode(QFileDialog.ExistingFile)
                 dialog.setNameFilter("WAD Files (*.wad);;All Files (*)")
                 if dialog.exec_():
@@ -122,17 +184,15 @@ class FileMixin:
             if not self.wad_path:
                 return
 
-            if self.temp_dir:
-                rmtree(self.temp_dir)
+            self.settle_jobs()
+            self.thumbnails.clear()
 
-            self.temp_dir = tempfile.mkdtemp(prefix="tmp-qtwaditor-")
-            self.history.set_temp_dir(self.temp_dir)
             self.history.reset_state()
 
-            self.lw_textures.clear()
+            self.texture_model.clear()
+            self.textures.clear()
             self.wad_game = get_wad_type(self.wad_path) or "QUAKE"
-            self.import_wad([self.wad_path])
-            self.save_pos = self.history.position
+            self.import_wad([self.wad_path], lazy=True)
 
             self.statusbar_text()
 
@@ -140,54 +200,91 @@ class FileMixin:
         except Exception as e:
             print(f"[open_wad] {e}")
 
-    def import_wad(self, wad_paths):
+    def import_wad(self, wad_paths, lazy=False):
         """
-        Imports textures from multiple WAD files.
+        Imports textures from multiple WAD files in the background. Textures
+        show up in the list in batches, as they're read.
 
         Args:
             wad_paths (list): List of paths to WAD files.
+            lazy (bool): If True, textures decode on demand from the WAD (used for
+                the opened WAD). Otherwise every WAD is decoded up front on a
+                process pool, so the editor doesn't keep foreign files mapped.
         """
         try:
             if len(wad_paths) < 1:
                 return
 
-            for wad in wad_paths:
-                self.unpack_wad(wad)
+            if lazy:
+                job = Job(
+                    f"Opening {os.path.basename(wad_paths[0])}",
+                    partial(_read_directories, wad_paths=wad_paths),
+                    "open",
+                )
+            else:
+                job = Job(
+                    f"Importing {len(wad_paths)} WAD(s)",
+                    partial(_decode_wads, wad_paths=wad_paths, workers=self.workers),
+                    "import",
+                )
 
-            self.history.new_change(self.get_list_state())
+            self.jobs.start(
+                job, self.add_textures, lambda done: self.import_done(lazy, done)
+            )
         except Exception as e:
             print(f"[import_wad] {e}")
 
     def import_image(self, images):
         """
-        Imports image files as textures.
+        Imports image files as textures in the background.
 
         Args:
             images (list): List of paths to image files.
         """
         try:
-            textures = import_texture(images, self.temp_dir)
-
-            if len(textures) < 1:
+            if len(images) < 1:
                 return
 
-            for t in textures:
-                scaled_pixmap = QtGui.QPixmap(t).scaled(
-                    self.texture_size, self.texture_size, QtCore.Qt.KeepAspectRatio
-                )
-
-                scaled_icon = QtGui.QIcon(scaled_pixmap)
-                item = QListWidgetItem(
-                    scaled_icon, os.path.splitext(os.path.basename(t))[0]
-                )
-
-                item.setData(QtCore.Qt.UserRole, t)  # icon path
+            job = Job(
+                f"Importing {len(images)} image(s)",
+                partial(_import_images, images=images, workers=self.workers),
+                "import",
+            )
+            self.jobs.start(job, self.add_textures, lambda _: self.import_done())
+        except Exception as e:
+            print(f"[import_image] {e}")
 
-                self.lw_textures.addItem(item)
+    def import_done(self, opened=False, done=False):
+        """
+        Records the imported textures in the history once an import is done,
+        cancelled or not.
 
+        Args:
+            opened (bool, optional): Whether the import opened a WAD, which
+                makes the new state the saved one.
+            done (bool, optional): Whether the import read everything. An open
+                that was cancelled or failed leaves an untitled workspace, so
+                saving can't overwrite the WAD with part of its textures.
+        """
+        try:
             self.history.new_change(self.get_list_state())
+            if opened and done:
+                self.save_pos = self.history.position
+            elif opened:
+                self.wad_path = None
+                self.title_management()
+
+            self.statusbar_text()
         except Exception as e:
-            print(f"[import_image] {e}")
+            print(f"[import_done] {e}")
+
+    def settle_jobs(self):
+        """
+        Cancels running opens and imports and waits for every job, so the
+        list can be replaced without results of old jobs landing in it.
+        """
+        self.jobs.cancel(("open", "import"))
+        self.jobs.wait()
 
     def import_wads_images(self, dropped_files=None):
         """
@@ -201,7 +298,7 @@ class FileMixin:
                 import_paths = dropped_files
             else:
                 dialog = QFileDialog(self, "Import file(s)")
-                dialog.setIconProvider(WadIconProvider())
+                WadIconProxy.attach(dialog)
                 dialog.setFileMode(QFileDialog.ExistingFiles)
                 dialog.setNameFilter(
                     "WAD Files (*.wad);;Images (*.png *.jpg *.jpeg);;All files (*)"
@@ -243,11 +340,15 @@ class FileMixin:
             export_images (bool): Export as image files instead of WAD if True.
         """
         try:
+            # the list isn't complete until opens and imports are done
+            if self.jobs.active(("open", "import")):
+                return
+
             export_path = None
 
             if not self.wad_path or save_as:
                 dialog = QFileDialog(self, "Save WAD file")
-                dialog.setIconProvider(WadIconProvider())
+                WadIconProxy.attach(dialog)
                 dialog.setAcceptMode(QFileDialog.AcceptSave)
                 dialog.setNameFilter(
                     "Quake WAD (*.wad);;Half-Life WAD (*.wad);;All Files (*)"
@@ -261,7 +362,7 @@ class FileMixin:
                     return
             elif export_images:
                 dialog = QFileDialog(self, "Select export directory")
-                dialog.setIconProvider(WadIconProvider())
+                WadIconProxy.attach(dialog)
                 dialog.setFileMode(QFileDialog.Directory)
                 if dialog.exec_():
                     export_path = dialog.selectedFiles()[0]
@@ -270,54 +371,65 @@ class FileMixin:
 
             if self.wad_path:
                 # show items
-                textures_list = []
                 if selected_only:
-                    for t in self.lw_textures.selectedItems():
-                        textures_list.append(t.data(QtCore.Qt.UserRole))
+                    textures_list = self.selected_names()
                 else:
-                    for t in range(self.lw_textures.count()):
-                        item = self.lw_textures.item(t)
-                        textures_list.append(item.data(QtCore.Qt.UserRole))
+                    textures_list = list(self.texture_model.names)
 
+                # textures are immutable, the job gets them as they are right now
                 if export_images:
-                    for t in textures_list:
-                        file_name = os.path.basename(t)
-                        destination_path = os.path.join(export_path, file_name)
-                        copyfile(t, destination_path)
+                    # the only place textures get written out as PNGs
+                    store = TextureStore()
+                    for name in textures_list:
+                        store[name] = self.textures[name]
+
+                    job = Job(
+                        f"Exporting {len(store)} image(s)",
+                        partial(_export, store=store, out_dir=export_path),
+                        "export",
+                    )
+                    self.jobs.start(job)
                 else:
-                    if self.wad_game == "HL":
-                        wadup_hl(textures_list, self.wad_path)
-                    else:
-                        wadup(textures_list, self.wad_path)
+                    job = Job(
+                        f"Saving {os.path.basename(self.wad_path)}",
+                        partial(
+                            _save,
+                            write=wadup_hl if self.wad_game == "HL" else wadup,
+                            textures=[self.textures[t] for t in textures_list],
+                            out_path=self.wad_path,
+                            workers=self.workers,
+                        ),
+                        "save",
+                    )
 
-                    self.save_pos = self.history.position
-                    self.statusbar_text()
+                    position = self.history.position
+                    self.jobs.start(
+                        job, on_finished=lambda saved: self.save_done(saved, position)
+                    )
 
         except Exception as e:
             print(f"[save_wad] {e}")
 
-    def unpack_wad(self, path):
+    def save_done(self, saved, position):
         """
-        Extracts textures from WAD file and adds them to texture list.
+        Marks the saved history position once a save job is done.
 
         Args:
-            path (str): Path to WAD file to unpack.
+            saved (bool): Whether the WAD was written, False if it was cancelled or failed.
+            position (int): History position the save was started at.
         """
         try:
-            unwadded = unwad(path, self.temp_dir)
-            temp_dir = unwadded[0]
-            textures = unwadded[1]
-
-            for t in textures:
-                scaled_pixmap = QtGui.QPixmap(f"{temp_dir}/{t}").scaled(
-                    self.texture_size, self.texture_size, QtCore.Qt.KeepAspectRatio
-                )
-
-                scaled_icon = QtGui.QIcon(scaled_pixmap)
-                item = QListWidgetItem(scaled_icon, str(t))
+            if saved:
+                self.save_pos = position
+            self.statusbar_text()
+        except Exception as e:
+            print(f"[save_done] {e}")
 
-                item.setData(QtCore.Qt.UserRole, f"{temp_dir}/{t}.png")  # icon path
+    def add_textures(self, textures):
+        """
+        Adds textures to the store and the texture list, renaming duplicates.
 
-                self.lw_textures.addItem(item)
-        except Exception as e:
-            print(f"[unpack_wad] {e}")
+        Args:
+            textures (list): Texture objects to add.
+        """
+        self.texture_model.extend([self.textures.add(t) for t in textures])
@@ -4,7 +4,6 @@
 from os import path
 from logging import error
 
-from PyQt5 import QtCore
 from PyQt5.QtWidgets import (
     QMessageBox,
 )
@@ -55,23 +54,25 @@ class ViewMixin:
             animation (bool): If True, enables animation preview for liquid textures.
         """
         try:
-            selected_items = self.lw_textures.selectedItems()
+            selected_names = self.selected_names()
 
-            if len(selected_items) != 1:
+            if len(selected_names) != 1:
                 print("can't preview 0 or more than 1 textures")
                 QMessageBox.warning(
                     self, "Qthon Error", "Can't preview multiple or no textures."
                 )
                 return
 
-            item = {
-                "title": selected_items[0].text(),
-                "path": selected_items[0].data(QtCore.Qt.UserRole),
-            }
-            if path.basename(item["path"]).startswith("*") and animation:
-                LiquidPreview(texture=item["path"], port=9742).exec()
+            texture = self.textures[selected_names[0]]
+
+            if texture.name.startswith("*") and animation:
+                # the liquid preview is served over HTTP, so it needs a real file
+                texture_path = texture.save(
+                    path.join(self.get_temp_dir(), f"{texture.name}.png")
+                )
+                LiquidPreview(texture=texture_path, port=9742).exec()
             else:
-                PreviewWindow(item["path"], 200, animation).exec_()
+                PreviewWindow(texture, 200, animation, self.textures).exec_()
         except Exception as e:
             error(f"[preview_texture] {e}")
 
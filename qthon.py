@@ -0,0 +1,355 @@
+#!/usr/bin/env python
+# pylint: disable=broad-exception-caught
+# pylint: disable=missing-function-docstring
+"""
+Headless batch tools, usable without a display server:
+
+    python -m qthon extract  WAD... -o DIR
+    python -m qthon build    IMAGE|DIR... -o OUT.wad [--format quake|hl]
+    python -m qthon merge    WAD... -o OUT.wad [--format quake|hl]
+    python -m qthon defullbright WAD... [-o OUT]
+    python -m qthon convert  WAD... --to quake|hl [-o OUT]
+
+Inputs can be files, directories or glob patterns. Nothing here imports PyQt.
+"""
+
+import os
+import sys
+import glob
+import argparse
+from multiprocessing import freeze_support
+
+from utils.pool import parallel_map, worker_count
+from utils.texture_store import Texture, TextureStore
+from utils.wadreader import open_wad, LUMP_TYPES
+from utils.wad import (
+    unwad,
+    wadup,
+    wadup_hl,
+    import_texture,
+    defullbright,
+    get_wad_type,
+)
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp")
+WAD_EXTENSIONS = (".wad",)
+
+# --format / --to values, and the get_wad_type() names they map to
+FORMATS = {"quake": "QUAKE", "hl": "HL"}
+
+
+def expand_inputs(patterns, extensions):
+    """
+    Expands files, directories and glob patterns into a list of files.
+
+    Args:
+        patterns (list): Paths, directories or glob patterns.
+        extensions (tuple): File extensions to pick up from directories.
+
+    Returns:
+        list: Matching files, in the order given, without duplicates.
+    """
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+
+        for match in matches:
+            if os.path.isdir(match):
+                for root, dirs, names in os.walk(match):
+                    dirs.sort()
+                    files += [
+                        os.path.join(root, n)
+                        for n in sorted(names)
+                        if n.lower().endswith(extensions)
+                    ]
+            elif os.path.isfile(match):
+                files.append(match)
+            else:
+                print(f"Not found: {match}", file=sys.stderr)
+
+    return list(dict.fromkeys(files))
+
+
+def output_path(wad_path, out, suffix, many):
+    """
+    Args:
+        wad_path (str): Input WAD.
+        out (str): Output file or directory from the command line, or None.
+        suffix (str): Added to the input name when there's no output given.
+        many (bool): Whether several WADs are processed, `out` is a directory then.
+
+    Returns:
+        str: Where the processed WAD goes.
+    """
+    if out is None:
+        stem, ext = os.path.splitext(wad_path)
+        return f"{stem}{suffix}{ext}"
+
+    if many or os.path.isdir(out):
+        return os.path.join(out, os.path.basename(wad_path))
+
+    return out
+
+
+def write_wad(textures, out_path, wad_format, workers):
+    """
+    Args:
+        textures (list): Texture objects, names get deduplicated.
+        out_path (str): Output WAD path.
+        wad_format (str): "QUAKE" or "HL".
+        workers (int): Number of worker processes. 0 means one per CPU core.
+    """
+    store = TextureStore()
+    textures = [store[store.add(t)] for t in textures]
+
+    if wad_format == "HL":
+        wadup_hl(textures, out_path, workers)
+    else:
+        wadup(textures, out_path, workers)
+
+    print(f"Wrote {len(textures)} textures to {out_path}")
+
+
+def for_each_wad(func, jobs, workers):
+    """
+    Runs `func(job, workers)` for every job. Several jobs are spread over the
+    pool one WAD per process, a single job gets the pool for itself.
+
+    Args:
+        func (callable): Module-level function taking a job and a worker count.
+        jobs (list): Picklable jobs.
+        workers (int): Number of worker processes. 0 means one per CPU core.
+
+    Returns:
+        list: Results of `func`, in the order of `jobs`.
+    """
+    if len(jobs) == 1:
+        return [func(jobs[0], workers)]
+
+    return parallel_map(_run_job, [(func, job) for job in jobs], workers)
+
+
+def _run_job(job):
+    func, args = job
+    return func(args, 1)
+
+
+# # # # # # # # # # # #
+# EXTRACT
+# # # # # # # # # # # #
+
+
+def _extract_lumps(job):
+    """
+    Writes a slice of a WAD directory as PNG files, runs in a worker process.
+
+    Args:
+        job (tuple): WAD path, output directory and (directory index, file name) pairs.
+
+    Returns:
+        int: Number of images written.
+    """
+    wad_path, out_dir, lumps = job
+    reader = open_wad(wad_path)
+
+    written = 0
+    for index, file_name in lumps:
+        entry = reader.entries[index]
+        texture = Texture(
+            entry.name, lump_type=LUMP_TYPES[entry.type], source=(reader, entry)
+        )
+        try:
+            texture.save(os.path.join(out_dir, file_name))
+            written += 1
+        except Exception as e:
+            print(f"Failed to extract {texture.name}: {e}", file=sys.stderr)
+
+    return written
+
+
+def extract(args):
+    wads = expand_inputs(args.inputs, WAD_EXTENSIONS)
+    if not wads:
+        return 1
+
+    jobs = []
+    for wad_path in wads:
+        try:
+            reader = open_wad(wad_path)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            continue
+
+        out_dir = args.output
+        if len(wads) > 1:
+            out_dir = os.path.join(
+                out_dir, os.path.splitext(os.path.basename(wad_path))[0]
+            )
+        os.makedirs(out_dir, exist_ok=True)
+
+        # same duplicate naming as the editor, worked out before splitting up
+        store = TextureStore()
+        lumps = []
+        for index, entry in enumerate(reader.entries):
+            if entry.type in LUMP_TYPES:
+                name = store.unique_name(entry.name)
+                store[name] = None
+                lumps.append((index, f"{name}.png"))
+
+        step = max(64, -(-len(lumps) // worker_count(args.workers)))
+        for start in range(0, len(lumps), step):
+            jobs.append((wad_path, out_dir, lumps[start : start + step]))
+
+    written = sum(parallel_map(_extract_lumps, jobs, args.workers))
+    print(f"Extracted {written} textures from {len(wads)} WAD(s)")
+    return 0
+
+
+# # # # # # # # # # # #
+# BUILD / MERGE
+# # # # # # # # # # # #
+
+
+def build(args):
+    images = expand_inputs(args.inputs, IMAGE_EXTENSIONS)
+    if not images:
+        return 1
+
+    step = max(16, -(-len(images) // worker_count(args.workers)))
+    chunks = [images[i : i + step] for i in range(0, len(images), step)]
+
+    textures = []
+    for chunk in parallel_map(import_texture, chunks, args.workers):
+        textures += chunk
+
+    write_wad(textures, args.output, FORMATS[args.format], args.workers)
+    return 0
+
+
+def merge(args):
+    wads = expand_inputs(args.inputs, WAD_EXTENSIONS)
+    if not wads:
+        return 1
+
+    textures = []
+    for wad_path in wads:
+        try:
+            textures += unwad(wad_path, lazy=True)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+
+    wad_format = FORMATS[args.format] if args.format else get_wad_type(wads[0])
+    write_wad(textures, args.output, wad_format, args.workers)
+    return 0
+
+
+# # # # # # # # # # # #
+# DEFULLBRIGHT / CONVERT
+# # # # # # # # # # # #
+
+
+def _defullbright_wad(job, workers):
+    wad_path, out_path = job
+    try:
+        textures = defullbright(unwad(wad_path, lazy=True), overwrite=True)
+        write_wad(textures, out_path, get_wad_type(wad_path), workers)
+    except Exception as e:
+        print(f"Error processing {wad_path}: {e}", file=sys.stderr)
+
+
+def defullbright_wads(args):
+    wads = expand_inputs(args.inputs, WAD_EXTENSIONS)
+    if not wads:
+        return 1
+
+    if args.output and len(wads) > 1:
+        os.makedirs(args.output, exist_ok=True)
+
+    jobs = [(w, output_path(w, args.output, "-dfb", len(wads) > 1)) for w in wads]
+    for_each_wad(_defullbright_wad, jobs, args.workers)
+    return 0
+
+
+def _convert_wad(job, workers):
+    wad_path, out_path, wad_format = job
+    try:
+        write_wad(unwad(wad_path, lazy=True), out_path, wad_format, workers)
+    except Exception as e:
+        print(f"Error processing {wad_path}: {e}", file=sys.stderr)
+
+
+def convert(args):
+    wads = expand_inputs(args.inputs, WAD_EXTENSIONS)
+    if not wads:
+        return 1
+
+    if args.output and len(wads) > 1:
+        os.makedirs(args.output, exist_ok=True)
+
+    wad_format = FORMATS[args.to]
+    jobs = [
+        (w, output_path(w, args.output, f"-{args.to}", len(wads) > 1), wad_format)
+        for w in wads
+    ]
+    for_each_wad(_convert_wad, jobs, args.workers)
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="qthon", description="Batch WAD texture tools, no GUI needed."
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=0,
+        help="worker processes, 0 means one per CPU core (default: 0)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    cmd = commands.add_parser("extract", help="write WAD textures as PNG files")
+    cmd.add_argument("inputs", nargs="+", help="WAD files, directories or globs")
+    cmd.add_argument("-o", "--output", default=".", help="output directory")
+    cmd.set_defaults(func=extract)
+
+    cmd = commands.add_parser("build", help="build a WAD from images")
+    cmd.add_argument("inputs", nargs="+", help="image files, directories or globs")
+    cmd.add_argument("-o", "--output", required=True, help="output WAD")
+    cmd.add_argument("--format", choices=FORMATS, default="quake")
+    cmd.set_defaults(func=build)
+
+    cmd = commands.add_parser("merge", help="merge several WADs into one")
+    cmd.add_argument("inputs", nargs="+", help="WAD files, directories or globs")
+    cmd.add_argument("-o", "--output", required=True, help="output WAD")
+    cmd.add_argument(
+        "--format", choices=FORMATS, help="output format (default: first input's)"
+    )
+    cmd.set_defaults(func=merge)
+
+    cmd = commands.add_parser("defullbright", help="remove fullbright colors")
+    cmd.add_argument("inputs", nargs="+", help="WAD files, directories or globs")
+    cmd.add_argument(
+        "-o", "--output", help="output WAD or directory (default: NAME-dfb.wad)"
+    )
+    cmd.set_defaults(func=defullbright_wads)
+
+    cmd = commands.add_parser("convert", help="convert between WAD2 and WAD3")
+    cmd.add_argument("inputs", nargs="+", help="WAD files, directories or globs")
+    cmd.add_argument("--to", choices=FORMATS, required=True, help="output format")
+    cmd.add_argument(
+        "-o", "--output", help="output WAD or directory (default: NAME-FORMAT.wad)"
+    )
+    cmd.set_defaults(func=convert)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    freeze_support()
+    sys.exit(main())
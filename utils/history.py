@@ -1,14 +1,78 @@
 # pylint: disable=missing-module-docstring
 # pylint: disable=broad-exception-caught
 # pylint: disable=multiple-imports
-import os, shutil
 from time import time
 from pprint import pprint
 
+from utils.profiling import timed
+
+
+class BlobStore:
+    """
+    Content-addressed texture storage shared by every history state.
+
+    Each distinct texture is kept once, under its digest, no matter how many
+    states refer to it. Textures are dropped once no state refers to them.
+    """
+
+    def __init__(self):
+        self.blobs = {}
+        self.refs = {}
+
+    def __len__(self):
+        return len(self.blobs)
+
+    def put(self, texture):
+        """
+        Stores a texture, or takes another reference to an identical one.
+
+        Args:
+            texture (Texture): Texture to store.
+
+        Returns:
+            str: Key of the stored texture.
+        """
+        key = texture.digest
+        if key not in self.blobs:
+            self.blobs[key] = texture
+            self.refs[key] = 0
+
+        self.refs[key] += 1
+        return key
+
+    def get(self, key, name=None):
+        """
+        Args:
+            key (str): Key of a stored texture.
+            name (str, optional): Name the texture should have.
+
+        Returns:
+            Texture: The stored texture, renamed to `name` if needed.
+        """
+        texture = self.blobs[key]
+        if name is not None and texture.name != name:
+            texture = texture.renamed(name)
+
+        return texture
+
+    def release(self, manifest):
+        """
+        Drops the references a state holds, freeing textures nothing uses anymore.
+
+        Args:
+            manifest (list): "list-state" of the dropped state.
+        """
+        for item in manifest:
+            key = item["blob"]
+            self.refs[key] -= 1
+            if self.refs[key] <= 0:
+                del self.refs[key]
+                del self.blobs[key]
+
 
 class History:
     """
-    Manages undo/redo functionality with file-based state snapshots.
+    Manages undo/redo functionality with in-memory state snapshots.
     """
 
     def __init__(self, history_limit=0):
@@ -19,7 +83,8 @@ class History:
             history_limit (int): Maximum number of states to keep in history. 0 for unlimited.
         """
         super().__init__()
-        self.temp_dir = None
+        self.store = None
+        self.blobs = BlobStore()
         self.history_limit = history_limit + 1
         self.state = [{"time": time(), "list-state": []}]
         self.position_callback = None
@@ -36,59 +101,61 @@ class History:
         if self.position_callback:
             self.position_callback()
 
-    def set_temp_dir(self, temp_dir):
+    def set_store(self, store):
         """
-        Sets temporary directory for storing state snapshots.
+        Sets the texture store that snapshots are restored into.
 
         Args:
-            temp_dir (str): Path to temporary directory.
+            store (TextureStore): The editor's texture store.
         """
-        self.temp_dir = temp_dir
-        self.SNAPSHOTS = os.path.join(temp_dir, "snapshots")
-
-        if not os.path.exists(self.SNAPSHOTS):
-            os.makedirs(self.SNAPSHOTS)
+        self.store = store
 
     def reset_state(self):
         """Resets history to initial empty state."""
         # no exceptions for this cuz there's no way this errors out somehow xddd
+        self.blobs = BlobStore()
         self.state = [{"time": time(), "list-state": []}]
         self.position = 1
 
+    @timed("history.new_change")
     def new_change(self, new_state):
         """
-        Records new state in history and creates snapshot.
+        Records new state in history.
 
         Args:
-            new_state (list): New state to record in history.
+            new_state (list): New state to record in history, as "title" and
+                "texture" items. Only a manifest of texture keys is kept, the
+                textures themselves go to the blob store.
         """
         try:
             current_time = time()
 
             if len(self.state) != self.position:
                 # clear any future if exists
-                self.state = self.state[: (len(self.state) - self.position)]
-
-            self.state.append({"time": current_time, "list-state": new_state})
+                for state in self.state[self.position :]:
+                    self.blobs.release(state["list-state"])
+                self.state = self.state[: self.position]
+
+            manifest = [
+                {"title": t["title"], "blob": self.blobs.put(t["texture"])}
+                for t in new_state
+            ]
+            self.state.append({"time": current_time, "list-state": manifest})
             self.position = len(self.state)
 
             # history limit
             if self.history_limit > 1:
                 if len(self.state) > self.history_limit:
-                    removed_snapshots = self.state[: -self.history_limit]
-                    for snapshot in removed_snapshots:
-                        snapshot_dir = os.path.join(
-                            self.SNAPSHOTS, str(snapshot["time"])
-                        )
-                        shutil.rmtree(snapshot_dir, ignore_errors=True)
+                    for state in self.state[: -self.history_limit]:
+                        self.blobs.release(state["list-state"])
                     self.state = self.state[-self.history_limit :]
                     self.position = self.history_limit
 
-            self.take_snapshot(str(current_time))
             self.print_state()
         except Exception as e:
             print(f"[History.new_change] {e}")
 
+    @timed("history.undo")
     def undo(self, times=1):
         """
         Moves backward in history.
@@ -110,6 +177,7 @@ class History:
         except Exception as e:
             print(f"[History.undo] {e}")
 
+    @timed("history.redo")
     def redo(self, times=1):
         """
         Moves forward in history.
@@ -141,60 +209,33 @@ class History:
         return
         pprint(self.state[self.position - 1])
 
-    def take_snapshot(self, snap_name):
-        """
-        Creates filesystem snapshot of current state.
-
-        Args:
-            snap_name (str): Name for the snapshot directory.
-        """
-        try:
-            if not self.temp_dir:
-                raise ValueError("temp_dir path is not set")
-
-            snap_dir = os.path.join(self.SNAPSHOTS, snap_name)
-            os.makedirs(snap_dir, exist_ok=True)
-
-            snap_state = self.state[self.position - 1]["list-state"]
-
-            for idx, item in enumerate(snap_state):
-                file_path = item.get("path")
-                if file_path:
-                    # extract filename from path
-                    filename = os.path.basename(file_path)
-                    # destination path for the copied file in the snapshot directory
-                    dest_path = os.path.join(snap_dir, filename)
-                    # copy the file to the snapshot directory
-                    shutil.copy(file_path, dest_path)
-        except Exception as e:
-            print(f"[History/take_snapshot] {e}")
-
+    @timed("history.load_snapshot")
     def load_snapshot(self, snap_name):
         """
-        Restores state from filesystem snapshot.
+        Restores the texture store from a recorded state, only replacing the
+        textures that differ from it.
 
         Args:
-            snap_name (str): Name of snapshot to restore.
+            snap_name (str): Name (time) of the state to restore.
         """
         try:
-            if not self.temp_dir:
-                raise ValueError("temp_dir path is not set")
+            if self.store is None:
+                raise ValueError("texture store is not set")
 
-            snap_dir = os.path.join(self.SNAPSHOTS, snap_name)
-            if not os.path.exists(snap_dir):
+            snapshot = next(
+                (s for s in self.state if str(s["time"]) == snap_name), None
+            )
+            if snapshot is None:
                 return
 
-            # remove shyt (except the snaps dir)
-            for filename in os.listdir(self.temp_dir):
-                file_path = os.path.join(self.temp_dir, filename)
-                if os.path.isfile(file_path) and filename != "snapshots":
-                    print(file_path)
-                    os.remove(file_path)
-
-            # copy shyt
-            for filename in os.listdir(snap_dir):
-                src_path = os.path.join(snap_dir, filename)
-                dest_path = os.path.join(self.temp_dir, filename)
-                shutil.copy(src_path, dest_path)
+            manifest = {item["title"]: item["blob"] for item in snapshot["list-state"]}
+
+            for name in [n for n in self.store if n not in manifest]:
+                self.store.remove(name)
+
+            for name, key in manifest.items():
+                current = self.store.get(name)
+                if current is None or current.digest != key:
+                    self.store[name] = self.blobs.get(key, name)
         except Exception as e:
             print(f"[History/load_snapshot] {e}")
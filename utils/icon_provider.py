@@ -1,61 +1,212 @@
-from PyQt5.QtCore import QFileInfo
+from PyQt5.QtCore import (
+    Qt,
+    QCoreApplication,
+    QIdentityProxyModel,
+    QObject,
+    QRunnable,
+    QThreadPool,
+    pyqtSignal,
+)
 from PyQt5.QtGui import QIcon, QPixmap, QPainter
 from PyQt5.QtWidgets import QFileIconProvider
 
-
+from utils.profiling import span
 from utils.wad import get_wad_type
 
+# files probed at once, reading them is waiting on the disk (or network), not work
+PROBE_THREADS = 4
+
 
-class WadIconProvider(QFileIconProvider):
+class _ProbeTask(QRunnable):
     """
-    A custom icon provider to display overlay icons on WAD files
-    based on their game type.
+    Reads the magic number of one WAD file on the thread pool.
     """
 
-    def __init__(self):
+    def __init__(self, cache, key):
         super().__init__()
-        self.WAD_ICONS = {
-            "DOOM": QPixmap(":/games/doom-48x48.png"),
-            "QUAKE": QPixmap(":/games/quake-48x48.png"),
-            "HL": QPixmap(":/games/hl1-32x32.png"),
-        }
+        self.cache = cache
+        self.key = key
+
+    def run(self):
+        with span("icons.probe"):
+            wad_type = get_wad_type(self.key[0])
+
+        self.cache.probed.emit(self.key, wad_type)
+
+
+class WadTypeCache(QObject):
+    """
+    Game types of WAD files, keyed by path, modification time and size, so a
+    file is only read again once it changes. Unknown files are probed on a
+    thread pool, `found` is emitted with the path of every probed file.
+
+    Only use it from the GUI thread, probes report back through a queued signal.
+    """
 
-    def icon(self, fileInfo: QFileInfo):
+    probed = pyqtSignal(object, object)
+    found = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        """
+        Args:
+            parent (QObject, optional): Parent object.
+        """
+        super().__init__(parent)
+        self.types = {}  # (path, mtime, size) -> game type or None
+        self.pending = set()
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(PROBE_THREADS)
+
+        # queued, probed is emitted from worker threads
+        self.probed.connect(self.store)
+
+    def get(self, file_info):
         """
-        Overrides the default icon implementation.
+        Returns the game type of a WAD file, or queues the file for probing.
 
         Args:
-            fileInfo (QFileInfo): Information about the file.
+            file_info (QFileInfo): The WAD file.
 
         Returns:
-            QIcon: The new icon for the file.
-        """
-        if fileInfo.isFile() and fileInfo.suffix().lower() == "wad":
-            wad_type = get_wad_type(fileInfo.filePath())
-
-            if wad_type and wad_type in self.WAD_ICONS:
-                # get the default icon
-                default_icon = super().icon(QFileIconProvider.File)
-                pixmap = default_icon.pixmap(32, 32)
-
-                # get overlay icon
-                overlay_pixmap = self.WAD_ICONS.get(wad_type)
-
-                if overlay_pixmap:
-                    # create a painter to compose the icons
-                    painter = QPainter(pixmap)
-                    try:
-                        # scale and draw the overlay
-                        overlay_scaled = overlay_pixmap.scaled(20, 20)
-                        painter.drawPixmap(
-                            pixmap.width() - overlay_scaled.width(),
-                            pixmap.height() - overlay_scaled.height(),
-                            overlay_scaled,
-                        )
-                    finally:
-                        painter.end()
-
-                return QIcon(pixmap)
-
-        # fallback to the default implementation
-        return super().icon(fileInfo)
+            str or None: The type of the WAD ('DOOM', 'QUAKE', 'HL'), or None if
+                it's not a WAD or it wasn't probed yet.
+        """
+        key = (
+            file_info.filePath(),
+            file_info.lastModified().toMSecsSinceEpoch(),
+            file_info.size(),
+        )
+        if key in self.types:
+            return self.types[key]
+
+        if key not in self.pending:
+            self.pending.add(key)
+            self.pool.start(_ProbeTask(self, key))
+
+        return None
+
+    def store(self, key, wad_type):
+        """Caches a probed type, files that aren't WADs are cached as None."""
+        self.pending.discard(key)
+        self.types[key] = wad_type
+        self.found.emit(key[0])
+
+
+_cache = None
+
+
+def wad_types():
+    """
+    Returns:
+        WadTypeCache: The cache shared by every file dialog.
+    """
+    global _cache  # pylint: disable=global-statement
+    if _cache is None:
+        _cache = WadTypeCache(QCoreApplication.instance())
+
+    return _cache
+
+
+class WadIconProxy(QIdentityProxyModel):
+    """
+    Proxy model for file dialogs, puts the game logo on the icons of WAD files.
+
+    Icons are looked up in data(), which the view calls on the GUI thread, unlike
+    a QFileIconProvider. Files the shared WadTypeCache hasn't seen yet keep the
+    plain file icon until they're probed, then only their row is repainted.
+    """
+
+    # game type -> file icon with the game overlay, composed once
+    icons = {}
+
+    def __init__(self, parent=None):
+        """
+        Args:
+            parent (QObject, optional): Parent object, usually the dialog.
+        """
+        super().__init__(parent)
+        self.types = wad_types()
+        self.types.found.connect(self.refresh)
+
+        if not WadIconProxy.icons:
+            overlays = {
+                "DOOM": QPixmap(":/games/doom-48x48.png"),
+                "QUAKE": QPixmap(":/games/quake-48x48.png"),
+                "HL": QPixmap(":/games/hl1-32x32.png"),
+            }
+            for wad_type, overlay_pixmap in overlays.items():
+                WadIconProxy.icons[wad_type] = self.compose(overlay_pixmap)
+
+    @staticmethod
+    def compose(overlay_pixmap):
+        """
+        Args:
+            overlay_pixmap (QPixmap): Game logo.
+
+        Returns:
+            QIcon: The default file icon with the logo in its corner.
+        """
+        # get the default icon
+        default_icon = QFileIconProvider().icon(QFileIconProvider.File)
+        pixmap = default_icon.pixmap(32, 32)
+
+        # create a painter to compose the icons
+        painter = QPainter(pixmap)
+        try:
+            # scale and draw the overlay
+            overlay_scaled = overlay_pixmap.scaled(20, 20)
+            painter.drawPixmap(
+                pixmap.width() - overlay_scaled.width(),
+                pixmap.height() - overlay_scaled.height(),
+                overlay_scaled,
+            )
+        finally:
+            painter.end()
+
+        return QIcon(pixmap)
+
+    @classmethod
+    def attach(cls, dialog):
+        """
+        Sets a new proxy on a file dialog. Only non-native dialogs use it.
+
+        Args:
+            dialog (QFileDialog): The dialog.
+        """
+        dialog.setProxyModel(cls(dialog))
+
+    def data(self, index, role=Qt.DisplayRole):
+        """
+        Overrides the icons of WAD files.
+
+        Args:
+            index (QModelIndex): Index in this model.
+            role (int, optional): Data role.
+
+        Returns:
+            The data of the source model, or the WAD icon for decorations.
+        """
+        if role == Qt.DecorationRole and index.column() == 0:
+            file_info = self.sourceModel().fileInfo(self.mapToSource(index))
+
+            if file_info.isFile() and file_info.suffix().lower() == "wad":
+                wad_type = self.types.get(file_info)
+                if wad_type in self.icons:
+                    return self.icons[wad_type]
+
+        return super().data(index, role)
+
+    def refresh(self, path):
+        """
+        Repaints the icon of a file once its type is known.
+
+        Args:
+            path (str): Path of the probed file.
+        """
+        source = self.sourceModel()
+        if source is None:
+            return
+
+        index = self.mapFromSource(source.index(path))
+        if index.isValid():
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
@@ -0,0 +1,173 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=broad-exception-caught
+from PyQt5.QtCore import QCoreApplication, QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class Cancelled(Exception):
+    """Raised inside a job by Job.report() once the job was cancelled."""
+
+
+class JobSignals(QObject):
+    """
+    Signals of a Job. They live in the GUI thread, so connected slots run
+    there no matter which thread emits.
+    """
+
+    progress = pyqtSignal(int, int)
+    batch = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    finished = pyqtSignal(object)
+
+
+class Job(QRunnable):
+    """
+    A long operation (opening, importing, saving) run off the GUI thread.
+
+    `work(job)` runs on the job thread. It reports progress and hands partial
+    results to the GUI in batches through the job, and stops when report()
+    raises Cancelled. `finished` is always emitted, with the return value of
+    `work`, or None if it was cancelled or failed.
+    """
+
+    def __init__(self, label, work, kind=None):
+        """
+        Args:
+            label (str): What the job does, shown next to its progress.
+            work (callable): Function taking the job, runs on the job thread.
+            kind (str, optional): What kind of job it is ("open", "import",
+                "save"...), to cancel some kinds of jobs only.
+        """
+        super().__init__()
+        self.setAutoDelete(False)  # the runner holds on to it until it's finished
+        self.label = label
+        self.work = work
+        self.kind = kind
+        self.cancelled = False
+        self.signals = JobSignals()
+
+    def report(self, done, total):
+        """
+        Reports progress, called by `work`.
+
+        Args:
+            done (int): Items done so far.
+            total (int): Items in total.
+
+        Raises:
+            Cancelled: If the job was cancelled, `work` should let it propagate.
+        """
+        if self.cancelled:
+            raise Cancelled()
+
+        self.signals.progress.emit(done, total)
+
+    def send(self, items):
+        """
+        Hands a batch of results to the GUI thread, called by `work`.
+
+        Args:
+            items (list): Results so far, e.g. textures to add to the list.
+        """
+        if items:
+            self.signals.batch.emit(items)
+
+    def cancel(self):
+        """Asks the job to stop at its next progress report."""
+        self.cancelled = True
+
+    def run(self):
+        result = None
+
+        try:
+            if not self.cancelled:
+                result = self.work(self)
+        except Cancelled:
+            pass
+        except Exception as e:
+            print(f"[Job] {self.label}: {e}")
+            self.signals.failed.emit(str(e))
+
+        self.signals.finished.emit(result)
+
+
+class JobRunner(QObject):
+    """
+    Runs jobs one after another on a background thread, so every job can rely
+    on the ones queued before it being done, and the GUI stays responsive.
+    """
+
+    progress = pyqtSignal(str, int, int)  # label, done, total
+    failed = pyqtSignal(str, str)  # label, error
+    busy = pyqtSignal(bool)
+    changed = pyqtSignal()  # a job was queued or is done
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.jobs = []  # queued or running
+
+    def start(self, job, on_batch=None, on_finished=None):
+        """
+        Queues a job.
+
+        Args:
+            job (Job): Job to run.
+            on_batch (callable, optional): Called in the GUI thread with every batch.
+            on_finished (callable, optional): Called in the GUI thread with the result.
+
+        Returns:
+            Job: The queued job.
+        """
+        job.signals.progress.connect(
+            lambda done, total: self.progress.emit(job.label, done, total)
+        )
+        job.signals.failed.connect(lambda message: self.failed.emit(job.label, message))
+        if on_batch:
+            job.signals.batch.connect(on_batch)
+        if on_finished:
+            job.signals.finished.connect(on_finished)
+        job.signals.finished.connect(lambda _: self.done(job))
+
+        self.jobs.append(job)
+        if len(self.jobs) == 1:
+            self.progress.emit(job.label, 0, 0)
+            self.busy.emit(True)
+        self.changed.emit()
+
+        self.pool.start(job)
+        return job
+
+    def done(self, job):
+        """Forgets a finished job."""
+        self.jobs.remove(job)
+        if not self.jobs:
+            self.busy.emit(False)
+        self.changed.emit()
+
+    def active(self, kinds=None):
+        """
+        Args:
+            kinds (tuple, optional): Only look for jobs of these kinds.
+
+        Returns:
+            bool: Whether any such job is queued or running.
+        """
+        return any(kinds is None or job.kind in kinds for job in self.jobs)
+
+    def cancel(self, kinds=None):
+        """
+        Cancels the running job and the queued ones.
+
+        Args:
+            kinds (tuple, optional): Only cancel jobs of these kinds.
+        """
+        for job in self.jobs:
+            if kinds is None or job.kind in kinds:
+                job.cancel()
+
+    def wait(self):
+        """Blocks until every job is done and its results were handed over."""
+        while self.jobs:
+            self.pool.waitForDone(10)
+            QCoreApplication.processEvents()
@@ -0,0 +1,125 @@
+# pylint: disable=missing-module-docstring
+import os
+import threading
+from collections import deque
+from itertools import islice
+from multiprocessing import get_context
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# one pool for the whole process, so workers import the app modules once
+_pool = None
+_pool_size = 0
+_lock = threading.Lock()
+
+
+def worker_count(workers=0):
+    """
+    Args:
+        workers (int): Wanted number of workers. 0 means one per CPU core.
+
+    Returns:
+        int: Number of workers to use.
+    """
+    if workers and workers > 0:
+        return workers
+
+    return os.cpu_count() or 1
+
+
+def executor(workers=0):
+    """
+    Returns the shared process pool, starting it on first use. Worker
+    processes are spawned as work comes in and stay around for later calls.
+
+    Args:
+        workers (int): Number of worker processes. 0 means one per CPU core.
+
+    Returns:
+        ProcessPoolExecutor: The pool, with exactly that many workers at most.
+    """
+    global _pool, _pool_size  # pylint: disable=global-statement
+    workers = worker_count(workers)
+
+    with _lock:
+        if _pool is not None and _pool_size != workers:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+        if _pool is None:
+            # spawn, so workers never inherit a forked copy of the Qt event loop
+            _pool = ProcessPoolExecutor(workers, mp_context=get_context("spawn"))
+            _pool_size = workers
+
+        return _pool
+
+
+def shutdown():
+    """Stops the shared process pool, if it was started."""
+    global _pool  # pylint: disable=global-statement
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def parallel_map(func, items, workers=0):
+    """
+    Maps `func` over `items` on a process pool and returns the results in order.
+    Runs serially when there's nothing to gain from a pool.
+
+    Args:
+        func (callable): Module-level (picklable) function taking one item.
+        items (iterable): Picklable arguments for `func`.
+        workers (int): Number of worker processes. 0 means one per CPU core.
+
+    Returns:
+        list: `func(item)` for every item, in the order of `items`.
+    """
+    return list(parallel_imap(func, items, workers))
+
+
+def parallel_imap(func, items, workers=0):
+    """
+    Like parallel_map, but yields every result as soon as it and the ones
+    before it are done, so callers can consume them without holding them all.
+    Only a few items per worker are in flight at a time, the next one is
+    submitted as each result is yielded.
+
+    Args:
+        func (callable): Module-level (picklable) function taking one item.
+        items (iterable): Picklable arguments for `func`.
+        workers (int): Number of worker processes. 0 means one per CPU core.
+
+    Yields:
+        `func(item)` for every item, in the order of `items`.
+    """
+    items = list(items)
+    workers = min(worker_count(workers), len(items))
+
+    if workers <= 1:
+        for i in items:
+            yield func(i)
+        return
+
+    pool = executor(workers)
+    pending = iter(items)
+    futures = deque()
+    try:
+        # enough queued that workers never wait on the caller
+        for i in islice(pending, workers * 2):
+            futures.append(pool.submit(func, i))
+
+        while futures:
+            result = futures.popleft().result()
+            for i in islice(pending, 1):
+                futures.append(pool.submit(func, i))
+            yield result
+    except BrokenProcessPool:
+        # a worker died, start over with a fresh pool next time
+        shutdown()
+        raise
+    finally:
+        # when the caller stops early, don't run items nobody wants anymore
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,128 @@
+# pylint: disable=missing-module-docstring
+import os
+import json
+import time
+import threading
+from functools import wraps
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
+# most recent spans kept for the trace, older ones only live on in the totals
+BUFFER_SIZE = 10000
+
+Span = namedtuple("Span", ["name", "start", "duration", "thread"])
+
+_spans = deque(maxlen=BUFFER_SIZE)
+_totals = {}  # name -> [count, total, max]
+_lock = threading.Lock()
+_origin = time.perf_counter()
+
+
+def record(name, start, duration):
+    """
+    Adds a finished span to the ring buffer and the totals.
+
+    Args:
+        name (str): Span name.
+        start (float): perf_counter() when it started.
+        duration (float): How long it took, in seconds.
+    """
+    _spans.append(Span(name, start, duration, threading.get_ident()))
+
+    with _lock:
+        totals = _totals.setdefault(name, [0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += duration
+        totals[2] = max(totals[2], duration)
+
+
+@contextmanager
+def span(name):
+    """
+    Times the code in a with block.
+
+    Args:
+        name (str): Span name, e.g. "wad.unwad".
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, start, time.perf_counter() - start)
+
+
+def timed(name):
+    """
+    Decorator timing every call of a function.
+
+    Args:
+        name (str): Span name.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, start, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def stats():
+    """
+    Returns:
+        list: (name, count, total, mean, max) tuples for every span name since
+            the last clear, slowest total first. Times are in seconds.
+    """
+    with _lock:
+        rows = [(n, c, t, t / c, m) for n, (c, t, m) in _totals.items()]
+
+    return sorted(rows, key=lambda r: r[2], reverse=True)
+
+
+def spans():
+    """Returns the spans in the ring buffer, oldest first."""
+    return list(_spans)
+
+
+def clear():
+    """Drops every recorded span and total."""
+    with _lock:
+        _spans.clear()
+        _totals.clear()
+
+
+def chrome_trace(out_path):
+    """
+    Writes the spans in the ring buffer as a Chrome trace, for chrome://tracing
+    or https://ui.perfetto.dev.
+
+    Args:
+        out_path (str): Output JSON path.
+
+    Returns:
+        int: Number of spans written.
+    """
+    pid = os.getpid()
+    events = [
+        {
+            "name": s.name,
+            "cat": s.name.split(".")[0],
+            "ph": "X",
+            "ts": (s.start - _origin) * 1e6,
+            "dur": s.duration * 1e6,
+            "pid": pid,
+            "tid": s.thread,
+        }
+        for s in spans()
+    ]
+
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    return len(events)
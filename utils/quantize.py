@@ -0,0 +1,173 @@
+# pylint: disable=missing-module-docstring
+import numpy as np
+from PIL import Image
+
+from utils.profiling import timed
+from utils.texture_store import QUAKE_PALETTE
+
+# nearest colours computed per batch, keeps the distance matrix around 4 MB
+_CHUNK = 4096
+
+# the Quake palette's table, shared by every quantize call in the process.
+# at 32 MB a table, other palettes are searched per call instead of cached
+_luts = {}
+
+# index -> index tables, per (palette, target palette)
+_remaps = {}
+
+
+class PaletteSearch:
+    """
+    Maps 24-bit RGB colours to the index of the nearest palette colour.
+
+    Every lookup searches the unique colours of its keys, nothing is kept
+    between calls. Used for palettes that only come up once or twice, like
+    the ones WAD3 textures bring along.
+    """
+
+    def __init__(self, palette):
+        """
+        Args:
+            palette (bytes): Palette as RGB triplets, up to 256 colours.
+        """
+        self.colors = np.frombuffer(palette, np.uint8).reshape(-1, 3).astype(np.float32)
+        self.norms = (self.colors**2).sum(axis=1)
+
+    @timed("quantize.search")
+    def lookup(self, keys):
+        """
+        Args:
+            keys (numpy.ndarray): Colours packed as 0xRRGGBB.
+
+        Returns:
+            numpy.ndarray: Palette index of every colour, same shape as `keys`.
+        """
+        unique, inverse = np.unique(keys, return_inverse=True)
+        return self.nearest(unique)[inverse.reshape(keys.shape)]
+
+    def nearest(self, keys):
+        """
+        Args:
+            keys (numpy.ndarray): Colours packed as 0xRRGGBB.
+
+        Returns:
+            numpy.ndarray: Palette index of the nearest colour of every key.
+        """
+        indices = np.empty(len(keys), np.uint8)
+        for start in range(0, len(keys), _CHUNK):
+            chunk = keys[start : start + _CHUNK]
+            rgb = np.stack(((chunk >> 16) & 0xFF, (chunk >> 8) & 0xFF, chunk & 0xFF), 1)
+
+            # |c - p|^2 without the |c|^2 term, which doesn't change the argmin.
+            # every value stays an integer below 2^24, so float32 is still exact
+            distance = self.norms - 2 * (rgb.astype(np.float32) @ self.colors.T)
+
+            indices[start : start + _CHUNK] = distance.argmin(axis=1)
+
+        return indices
+
+
+class PaletteLUT(PaletteSearch):
+    """
+    Maps 24-bit RGB colours to the index of the nearest palette colour.
+
+    The table covers every RGB value but is filled lazily: the nearest colour
+    is only searched for the first time a colour shows up, after that mapping
+    an image is a single gather.
+    """
+
+    def __init__(self, palette):
+        """
+        Args:
+            palette (bytes): Palette as RGB triplets, up to 256 colours.
+        """
+        super().__init__(palette)
+        self.table = np.zeros(1 << 24, np.uint8)
+        self.filled = np.zeros(1 << 24, np.bool_)
+
+    def lookup(self, keys):
+        """
+        Args:
+            keys (numpy.ndarray): Colours packed as 0xRRGGBB.
+
+        Returns:
+            numpy.ndarray: Palette index of every colour, same shape as `keys`.
+        """
+        missing = ~self.filled[keys]
+        if missing.any():
+            self.fill(np.unique(keys[missing]))
+
+        return self.table[keys]
+
+    @timed("quantize.fill_lut")
+    def fill(self, keys):
+        """
+        Searches the nearest palette colour of `keys` and stores it in the table.
+
+        Args:
+            keys (numpy.ndarray): Unique colours packed as 0xRRGGBB.
+        """
+        self.table[keys] = self.nearest(keys)
+        self.filled[keys] = True
+
+
+def palette_lut(palette=QUAKE_PALETTE):
+    """
+    Args:
+        palette (bytes, optional): Palette as RGB triplets. Defaults to the Quake palette.
+
+    Returns:
+        PaletteSearch: The lookup table of the Quake palette, built on first
+            use, or a table-less search for any other palette.
+    """
+    palette = bytes(palette)
+    if palette != QUAKE_PALETTE:
+        return PaletteSearch(palette)
+
+    if palette not in _luts:
+        _luts[palette] = PaletteLUT(palette)
+
+    return _luts[palette]
+
+
+def remap_table(palette, target=QUAKE_PALETTE):
+    """
+    Maps every index of a palette to the index of the nearest color of another.
+
+    Args:
+        palette (bytes): Source palette, 768 bytes of RGB.
+        target (bytes, optional): Palette to map to. Defaults to the Quake palette.
+
+    Returns:
+        bytes: 256 target indices, one per source index, usable with bytes.translate().
+    """
+    key = (bytes(palette), bytes(target))
+    if key not in _remaps:
+        rgb = np.frombuffer(key[0], np.uint8).reshape(-1, 3).astype(np.int32)
+        colors = (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+
+        _remaps[key] = palette_lut(target).lookup(colors).tobytes()
+
+    return _remaps[key]
+
+
+@timed("quantize.quantize")
+def quantize(img, palette=QUAKE_PALETTE):
+    """
+    Maps every pixel of an image to the nearest colour of a palette, without dithering.
+
+    Args:
+        img (PIL.Image.Image): Image to quantize.
+        palette (bytes, optional): Palette as RGB triplets. Defaults to the Quake palette.
+
+    Returns:
+        PIL.Image.Image: The image in "P" mode, with `palette` padded to 256 colours.
+    """
+    rgb = np.asarray(img.convert("RGB"), dtype=np.int32)
+    keys = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+    indices = palette_lut(palette).lookup(keys.ravel())
+
+    quantized = Image.frombytes("P", img.size, indices.tobytes())
+    quantized.putpalette(bytes(palette) + bytes(768 - len(palette)))
+    return quantized
@@ -0,0 +1,134 @@
+# pylint: disable=missing-module-docstring
+import math
+
+from PIL import Image
+
+from utils.pool import parallel_imap
+from utils.quantize import quantize
+from utils.texture_store import Texture, QUAKE_PALETTE
+
+# resampling filters offered by the resize dialog, by name
+FILTERS = {
+    "Nearest": Image.NEAREST,
+    "Bilinear": Image.BILINEAR,
+    "Bicubic": Image.BICUBIC,
+    "Lanczos": Image.LANCZOS,
+}
+
+# textures sent to a worker at once
+CHUNK = 8
+
+# colors 224-254 glow in Quake, resampling shouldn't introduce them
+_NO_FULLBRIGHTS = QUAKE_PALETTE[: 224 * 3]
+
+
+def power_of_two(size, smallest=16, largest=512):
+    """
+    Args:
+        size (int): A texture dimension.
+        smallest (int, optional): Lower bound of the result.
+        largest (int, optional): Upper bound of the result.
+
+    Returns:
+        int: The power of two closest to `size`, within the bounds.
+    """
+    return min(max(2 ** round(math.log2(max(size, 1))), smallest), largest)
+
+
+def resize_texture(texture, size, filter_name="Lanczos"):
+    """
+    Resizes a texture, keeping its palette.
+
+    Anything but nearest neighbour resamples in RGB and maps the result back
+    to the texture's palette through its lookup table. Quake textures without
+    fullbright pixels don't get any from that. Masked ('{') textures always
+    use nearest neighbour, so their transparent pixels stay exact.
+
+    Args:
+        texture (Texture): Texture to resize.
+        size (tuple): New width and height.
+        filter_name (str, optional): Key of FILTERS.
+
+    Returns:
+        Texture: The resized texture.
+    """
+    size = tuple(size)
+    if size == texture.size:
+        return texture
+
+    palette = bytes(texture.palette)
+    img = texture.to_image()
+
+    if filter_name == "Nearest" or texture.name.startswith("{"):
+        indices = img.resize(size, Image.NEAREST).tobytes()
+    else:
+        target = palette
+        if palette == QUAKE_PALETTE and max(texture.pixels) < 224:
+            target = _NO_FULLBRIGHTS
+
+        resized = img.convert("RGB").resize(size, FILTERS[filter_name])
+        indices = quantize(resized, target).tobytes()
+
+    return Texture(texture.name, size[0], size[1], indices, palette, texture.lump_type)
+
+
+def mip_levels(img, masked=False):
+    """
+    Builds the four mip levels of a MIPTEX lump, each half the size of the
+    one before. Smaller levels average the pixels in RGB and quantize them
+    back, masked ('{') textures take every other pixel so transparency stays
+    exact.
+
+    Args:
+        img (PIL.Image.Image): Texture image in the Quake palette ("P" mode).
+        masked (bool, optional): Whether the texture is masked.
+
+    Returns:
+        list: Palette indices of every level, largest first.
+    """
+    sizes = [(img.width // pow(2, i), img.height // pow(2, i)) for i in range(4)]
+    if masked:
+        return [img.resize(size, Image.NEAREST).tobytes() for size in sizes]
+
+    indices = img.tobytes()
+    target = QUAKE_PALETTE if max(indices) >= 224 else _NO_FULLBRIGHTS
+
+    rgb = img.convert("RGB")
+    return [indices] + [
+        quantize(rgb.resize(size, Image.BOX), target).tobytes() for size in sizes[1:]
+    ]
+
+
+def _resize_chunk(job):
+    """
+    Resizes a few textures, runs in a worker process.
+
+    Args:
+        job (tuple): Textures, their new sizes and the filter name.
+
+    Returns:
+        list: The resized textures.
+    """
+    textures, sizes, filter_name = job
+    return [resize_texture(t, s, filter_name) for t, s in zip(textures, sizes)]
+
+
+def iter_resize(textures, sizes, filter_name="Lanczos", workers=0):
+    """
+    Resizes textures on a process pool, yielding them in chunks as they're done.
+
+    Args:
+        textures (list): Textures to resize.
+        sizes (list): New width and height of every texture.
+        filter_name (str, optional): Key of FILTERS.
+        workers (int, optional): Number of worker processes. 0 means one per CPU core.
+
+    Yields:
+        list: Resized textures, in the order of `textures`.
+    """
+    jobs = [
+        (textures[i : i + CHUNK], sizes[i : i + CHUNK], filter_name)
+        for i in range(0, len(textures), CHUNK)
+    ]
+
+    yield from parallel_imap(_resize_chunk, jobs, workers)
@@ -0,0 +1,87 @@
+# pylint: disable=missing-module-docstring
+import re
+
+
+def fuzzy_pattern(query):
+    """
+    Args:
+        query (str): Lowercase search text.
+
+    Returns:
+        re.Pattern: Matches names containing the characters of `query`, in
+            order, with anything in between.
+    """
+    return re.compile(".*?".join(re.escape(c) for c in query))
+
+
+class SearchIndex:
+    """
+    Character index over texture names for fuzzy search.
+
+    A name can only match a query if it contains every character of it, so
+    intersecting the per-character sets narrows the names down before any
+    of them is actually matched.
+    """
+
+    def __init__(self):
+        self.names = {}  # name -> lowercase name
+        self.chars = {}  # character -> names containing it
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name):
+        """
+        Args:
+            name (str): Name to index.
+        """
+        if name in self.names:
+            return
+
+        lower = name.lower()
+        self.names[name] = lower
+        for c in set(lower):
+            self.chars.setdefault(c, set()).add(name)
+
+    def remove(self, name):
+        """
+        Args:
+            name (str): Name to drop from the index.
+        """
+        lower = self.names.pop(name, None)
+        if lower is None:
+            return
+
+        for c in set(lower):
+            self.chars[c].discard(name)
+
+    def clear(self):
+        """Drops every name."""
+        self.names.clear()
+        self.chars.clear()
+
+    def find(self, query, candidates=None):
+        """
+        Args:
+            query (str): Search text, case insensitive.
+            candidates (set, optional): Only search among these names, e.g. the
+                results of a shorter query.
+
+        Returns:
+            set: Names matching `query`.
+        """
+        query = query.lower()
+
+        sets = sorted((self.chars.get(c, set()) for c in set(query)), key=len)
+        if candidates is not None:
+            sets.insert(0, candidates)
+        if not sets:
+            return set(self.names)
+
+        found = sets[0].intersection(*sets[1:])
+
+        pattern = fuzzy_pattern(query)
+        return {n for n in found if n in self.names and pattern.search(self.names[n])}
@@ -70,6 +70,8 @@ class Config:
             "default_zoom": 128,
             "water_port": 9742,
             "undo_limit": 0,
+            "workers": 0,
+            "thumbnail_cache_mb": 64,
             "hide_item": {
                 "sidebar": False,
                 "statusbar": False,
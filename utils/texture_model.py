@@ -0,0 +1,327 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=invalid-name
+from PyQt5.QtCore import (
+    Qt,
+    QAbstractListModel,
+    QModelIndex,
+    QSize,
+    QSortFilterProxyModel,
+)
+from PyQt5.QtGui import QIcon, QPixmap
+from PyQt5.QtWidgets import QStyledItemDelegate
+
+from utils.search import SearchIndex, fuzzy_pattern
+
+
+class TextureListModel(QAbstractListModel):
+    """
+    List model over the texture names of the open WAD.
+
+    Rows only hold names, textures themselves stay in the TextureStore.
+    Thumbnails are requested when the view asks for a row's decoration,
+    which only happens for rows that are being painted.
+    """
+
+    def __init__(self, store, thumbnails, icon_size=128, parent=None):
+        """
+        Args:
+            store (TextureStore): Textures shown by the model.
+            thumbnails (ThumbnailService): Renders the row icons.
+            icon_size (int, optional): Thumbnail size.
+            parent (QObject, optional): Parent object.
+        """
+        super().__init__(parent)
+        self.store = store
+        self.thumbnails = thumbnails
+        self.icon_size = icon_size
+        self.names = []
+        self.rows = None  # name -> row, rebuilt when needed
+        self.search = SearchIndex()
+        self.placeholders = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.names):
+            return None
+
+        name = self.names[index.row()]
+
+        if role in (Qt.DisplayRole, Qt.UserRole, Qt.ToolTipRole):
+            return name
+        if role == Qt.DecorationRole:
+            return self.icon(name)
+
+        return None
+
+    def icon(self, name):
+        """
+        Args:
+            name (str): Texture name.
+
+        Returns:
+            QIcon: The thumbnail of the texture, or a placeholder while it renders.
+        """
+        texture = self.store.get(name)
+        image = None
+        if texture is not None:
+            image = self.thumbnails.get(texture, self.icon_size)
+
+        if image is None or image.isNull():
+            return self.placeholder()
+
+        return QIcon(QPixmap.fromImage(image))
+
+    def placeholder(self):
+        """Returns a transparent icon of the current thumbnail size."""
+        if self.icon_size not in self.placeholders:
+            pixmap = QPixmap(self.icon_size, self.icon_size)
+            pixmap.fill(Qt.transparent)
+            self.placeholders[self.icon_size] = QIcon(pixmap)
+
+        return self.placeholders[self.icon_size]
+
+    def set_icon_size(self, size):
+        """
+        Args:
+            size (int): New thumbnail size.
+        """
+        self.icon_size = size
+        self.refresh()
+
+    def name(self, row):
+        """Returns the texture name at `row`."""
+        return self.names[row]
+
+    def row(self, name):
+        """Returns the row of the texture called `name`, or -1."""
+        if self.rows is None:
+            self.rows = {n: i for i, n in enumerate(self.names)}
+
+        return self.rows.get(name, -1)
+
+    def append(self, name):
+        """
+        Adds a texture at the end of the list.
+
+        Args:
+            name (str): Texture name.
+        """
+        self.insert(len(self.names), [name])
+
+    def extend(self, names):
+        """
+        Adds textures at the end of the list, as a single insertion, so the
+        view lays out once for the whole batch.
+
+        Args:
+            names (list): Texture names.
+        """
+        self.insert(len(self.names), list(names))
+
+    def insert(self, row, names):
+        """
+        Inserts textures before `row`.
+
+        Args:
+            row (int): Row to insert at.
+            names (list): Texture names.
+        """
+        if not names:
+            return
+
+        self.beginInsertRows(QModelIndex(), row, row + len(names) - 1)
+        self.names[row:row] = names
+        self.rows = None
+        for name in names:
+            self.search.add(name)
+        self.endInsertRows()
+
+    def remove(self, rows):
+        """
+        Removes rows, in as few contiguous blocks as possible.
+
+        Args:
+            rows (iterable): Rows to remove.
+        """
+        rows = sorted(set(rows), reverse=True)
+
+        i = 0
+        while i < len(rows):
+            last = first = rows[i]
+            i += 1
+            while i < len(rows) and rows[i] == first - 1:
+                first = rows[i]
+                i += 1
+
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for name in self.names[first : last + 1]:
+                self.search.remove(name)
+            del self.names[first : last + 1]
+            self.rows = None
+            self.endRemoveRows()
+
+    def rename(self, row, name):
+        """
+        Args:
+            row (int): Row of the texture.
+            name (str): New texture name.
+        """
+        self.search.remove(self.names[row])
+        self.search.add(name)
+        self.names[row] = name
+        self.rows = None
+        self.dataChanged.emit(self.index(row), self.index(row))
+
+    def clear(self):
+        """Removes every row."""
+        self.beginResetModel()
+        self.names = []
+        self.rows = None
+        self.search.clear()
+        self.endResetModel()
+
+    def set_names(self, names):
+        """
+        Changes the list to `names`, only touching rows that differ, so
+        selection and unchanged rows survive.
+
+        Args:
+            names (list): Texture names, in order.
+        """
+        wanted = set(names)
+        self.remove(i for i, n in enumerate(self.names) if n not in wanted)
+
+        kept = set(self.names)
+        order = [n for n in names if n in kept]
+        if order != self.names:
+            self.reorder(order)
+
+        # what's left are runs of new names in between the kept ones
+        row = 0
+        while row < len(names):
+            if names[row] in kept:
+                row += 1
+                continue
+
+            end = row
+            while end < len(names) and names[end] not in kept:
+                end += 1
+
+            self.insert(row, names[row:end])
+            row = end
+
+        # textures may have changed under unchanged names
+        self.refresh()
+
+    def sort(self, column=0, order=Qt.AscendingOrder):
+        """Sorts the rows by name, keeping the selection."""
+        self.reorder(sorted(self.names, reverse=order == Qt.DescendingOrder))
+
+    def reorder(self, names):
+        """
+        Puts the rows in a new order, keeping the selection.
+
+        Args:
+            names (list): The current names, in their new order.
+        """
+        self.layoutAboutToBeChanged.emit()
+
+        persistent = self.persistentIndexList()
+        moved = [self.names[i.row()] for i in persistent]
+
+        self.names = list(names)
+        self.rows = None
+
+        self.changePersistentIndexList(
+            persistent, [self.index(self.row(n)) for n in moved]
+        )
+        self.layoutChanged.emit()
+
+    def refresh(self, rows=None):
+        """
+        Makes the view repaint rows, e.g. after their texture changed.
+
+        Args:
+            rows (list, optional): Rows to repaint. Defaults to every row.
+        """
+        if not self.names:
+            return
+
+        if rows is None:
+            rows = [0, len(self.names) - 1]
+
+        self.dataChanged.emit(
+            self.index(min(rows)), self.index(max(rows)), [Qt.DecorationRole]
+        )
+
+
+class TextureFilterModel(QSortFilterProxyModel):
+    """
+    Hides textures whose names don't fuzzy-match the search text.
+
+    Matches come from the source model's search index. A query that extends
+    the previous one only searches among the previous results, and names
+    added after the search ran are matched one by one as they show up.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.query = ""
+        self.pattern = None
+        self.matched = set()
+        self.checked = set()  # names the current matches were searched among
+
+    def set_query(self, text):
+        """
+        Args:
+            text (str): Search text, an empty string shows every texture.
+        """
+        query = text.lower()
+        search = self.sourceModel().search
+
+        if not query:
+            self.matched, self.checked = set(), set()
+        elif self.query and query.startswith(self.query):
+            # everything matching the longer query matched the shorter one too
+            new = search.names.keys() - self.checked
+            self.matched = search.find(query, self.matched | new)
+            self.checked = set(search.names)
+        else:
+            self.matched = search.find(query)
+            self.checked = set(search.names)
+
+        self.query = query
+        self.pattern = fuzzy_pattern(query)
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self.query:
+            return True
+
+        name = self.sourceModel().name(source_row)
+        if name not in self.checked:
+            self.checked.add(name)
+            if self.pattern.search(name.lower()):
+                self.matched.add(name)
+
+        return name in self.matched
+
+
+class TextureDelegate(QStyledItemDelegate):
+    """
+    Sizes rows from the icon size and font alone, so laying out thousands of
+    rows doesn't request a single thumbnail.
+    """
+
+    def sizeHint(self, option, index):
+        size = option.decorationSize
+        text_height = option.fontMetrics.height() * 2  # name, wrapped to 2 lines
+
+        return QSize(max(size.width(), 64) + 8, size.height() + text_height + 8)
@@ -0,0 +1,382 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=too-many-arguments
+import os
+import hashlib
+from collections import namedtuple
+
+from PIL import Image
+
+from vgio import quake
+
+# flattened quake palette, shared by everything that needs it
+QUAKE_PALETTE = bytes(c for rgb in quake.palette for c in rgb)
+
+# what the status bar and dialogs show about a texture
+TextureInfo = namedtuple(
+    "TextureInfo", ["width", "height", "palette", "lump_type", "lump_size"]
+)
+
+
+class Texture:
+    """
+    In-memory 8-bit indexed texture.
+
+    Textures are treated as immutable: operations that change pixels or names
+    create a new Texture instead of modifying an existing one, so the same
+    object can safely be shared between the store and the undo history.
+
+    A texture can also be backed by a lump of an open WAD (`source`), in which
+    case its pixels are only decoded the first time they're needed.
+    """
+
+    __slots__ = (
+        "name",
+        "_width",
+        "_height",
+        "_pixels",
+        "_palette",
+        "lump_type",
+        "source",
+        "_digest",
+        "_info",
+        "__weakref__",
+    )
+
+    def __init__(
+        self,
+        name,
+        width=None,
+        height=None,
+        pixels=None,
+        palette=None,
+        lump_type="MIPTEX",
+        source=None,
+        info=None,
+    ):
+        """
+        Args:
+            name (str): Texture (lump) name.
+            width (int): Width in pixels.
+            height (int): Height in pixels.
+            pixels (bytes): Palette indices, `width * height` bytes. May be a
+                read-only `memoryview` for textures decoded from a WAD.
+            palette (bytes, optional): 768 bytes of RGB. Defaults to the Quake palette.
+            lump_type (str, optional): Lump type the texture came from ("MIPTEX" or "QPIC").
+            source (tuple, optional): WadReader and WadEntry to decode the pixels from.
+            info (TextureInfo, optional): What's known about the texture from
+                its lump, so showing it doesn't need the pixels.
+        """
+        self.name = name
+        self._width = width
+        self._height = height
+        self._pixels = pixels
+        self._palette = palette or (None if source else QUAKE_PALETTE)
+        self.lump_type = lump_type
+        self.source = source
+        self._digest = None
+        self._info = info
+
+        if source is not None:
+            source[0].track(self)
+
+    def __reduce__(self):
+        # sent to worker processes fully decoded, readers and views don't pickle
+        return (
+            Texture,
+            (
+                self.name,
+                self.width,
+                self.height,
+                bytes(self.pixels),
+                bytes(self.palette),
+                self.lump_type,
+                None,
+                self._info,
+            ),
+        )
+
+    def load(self):
+        """
+        Decodes the pixels from the source lump, if that didn't happen yet.
+
+        Returns:
+            Texture: This texture.
+        """
+        if self._pixels is None and self.source is not None:
+            reader, entry = self.source
+
+            # a detach can't slip in between decoding and storing the views
+            with reader.lock:
+                if self._pixels is None:
+                    width, height, pixels, palette = reader.decode(entry)
+
+                    # pixels last, thumbnail threads may decode while the GUI reads
+                    self._width, self._height, self._palette = width, height, palette
+                    self._pixels = pixels
+
+        return self
+
+    def detach(self):
+        """Copies pixels that are still views of the source WAD into memory."""
+        if isinstance(self._pixels, memoryview):
+            self._pixels = bytes(self._pixels)
+        if isinstance(self._palette, memoryview):
+            self._palette = bytes(self._palette)
+
+    @property
+    def loaded(self):
+        """Whether the pixels are in memory."""
+        return self._pixels is not None
+
+    @property
+    def width(self):
+        """Width in pixels."""
+        return self.load()._width
+
+    @property
+    def height(self):
+        """Height in pixels."""
+        return self.load()._height
+
+    @property
+    def pixels(self):
+        """Palette indices, one byte per pixel."""
+        return self.load()._pixels
+
+    @property
+    def palette(self):
+        """768 bytes of RGB."""
+        return self.load()._palette
+
+    @property
+    def digest(self):
+        """
+        Content key of the texture, ignoring its name. Textures that weren't
+        decoded yet are keyed by their source lump instead of their pixels,
+        through the serial of the reader, which no other reader ever gets.
+        """
+        if self._digest is None:
+            if self.loaded:
+                content = hashlib.blake2b(digest_size=16)
+                content.update(
+                    f"{self.lump_type}:{self._width}x{self._height}".encode()
+                )
+                content.update(self._pixels)
+                content.update(self._palette)
+                self._digest = content.hexdigest()
+            else:
+                reader, entry = self.source
+                self._digest = f"wad{reader.serial}:{entry.offset}"
+
+        return self._digest
+
+    @property
+    def info(self):
+        """
+        TextureInfo of the texture. Palette is "Quake" or "Custom", lump size
+        is the size of the lump it was read from, or the size it will have as
+        a MIPTEX lump. Textures read from a WAD get it from the lump header,
+        others work it out once, from their pixels.
+        """
+        if self._info is None:
+            width, height = self.size
+
+            if self.source is not None:
+                lump_size = self.source[1].disk_size
+            else:
+                lump_size = 40 + width * height * 85 // 64
+                if self.palette != QUAKE_PALETTE:
+                    lump_size += 2 + 768  # WAD3 keeps the palette in the lump
+
+            self._info = TextureInfo(
+                width,
+                height,
+                "Quake" if self.palette == QUAKE_PALETTE else "Custom",
+                self.lump_type,
+                lump_size,
+            )
+
+        return self._info
+
+    @property
+    def size(self):
+        """Width and height of the texture."""
+        return self.width, self.height
+
+    @classmethod
+    def from_image(cls, name, img, lump_type="MIPTEX"):
+        """
+        Creates a texture from a palettized PIL image.
+
+        Args:
+            name (str): Texture name.
+            img (PIL.Image.Image): Image in "P" mode.
+            lump_type (str, optional): Lump type of the texture.
+
+        Returns:
+            Texture: The new texture.
+        """
+        palette = bytes(img.getpalette() or QUAKE_PALETTE)[:768]
+        palette += bytes(768 - len(palette))
+
+        return cls(name, img.width, img.height, img.tobytes(), palette, lump_type)
+
+    def to_image(self):
+        """
+        Returns:
+            PIL.Image.Image: The texture as a "P" mode image.
+        """
+        img = Image.frombuffer("P", self.size, self.pixels, "raw", "P", 0, 1)
+        img.putpalette(self.palette)
+        return img
+
+    def renamed(self, name):
+        """
+        Args:
+            name (str): New texture name.
+
+        Returns:
+            Texture: A copy of this texture with a different name.
+        """
+        texture = Texture(
+            name,
+            self._width,
+            self._height,
+            self._pixels,
+            self._palette,
+            self.lump_type,
+            self.source,
+        )
+        texture._digest = self._digest
+        texture._info = self._info
+        return texture
+
+    def save(self, path):
+        """
+        Writes the texture as a PNG file.
+
+        Args:
+            path (str): Output path.
+
+        Returns:
+            str: The output path.
+        """
+        self.to_image().save(path, format="PNG")
+        return path
+
+
+class TextureStore:
+    """
+    Holds the textures of the open WAD in memory, keyed by texture name.
+    """
+
+    def __init__(self):
+        self.textures = {}
+        self.suffixes = {}  # base name -> next ' (n)' suffix to try
+
+    def __contains__(self, name):
+        return name in self.textures
+
+    def __getitem__(self, name):
+        return self.textures[name]
+
+    def __setitem__(self, name, texture):
+        self.textures[name] = texture
+
+    def __len__(self):
+        return len(self.textures)
+
+    def __iter__(self):
+        return iter(self.textures)
+
+    def get(self, name, default=None):
+        """Returns the texture called `name`, or `default`."""
+        return self.textures.get(name, default)
+
+    def clear(self):
+        """Removes every texture."""
+        self.textures.clear()
+        self.suffixes.clear()
+
+    def unique_name(self, name):
+        """
+        Appends a ' (n)' suffix to `name` until it doesn't collide with a stored texture.
+
+        Suffixes count up per base name from where the last collision left off,
+        so importing many files with the same name doesn't probe every taken one.
+
+        Args:
+            name (str): Wanted texture name.
+
+        Returns:
+            str: A free texture name.
+        """
+        if name not in self.textures:
+            return name
+
+        count = self.suffixes.get(name, 1)
+        new_name = f"{name} ({count})"
+        while new_name in self.textures:
+            count += 1
+            new_name = f"{name} ({count})"
+
+        self.suffixes[name] = count + 1
+        return new_name
+
+    def add(self, texture):
+        """
+        Adds a texture, renaming it if its name is already taken.
+
+        Args:
+            texture (Texture): Texture to add.
+
+        Returns:
+            str: The name the texture was stored under.
+        """
+        name = self.unique_name(texture.name)
+        if name != texture.name:
+            texture = texture.renamed(name)
+
+        self.textures[name] = texture
+        return name
+
+    def remove(self, name):
+        """
+        Removes a texture.
+
+        Args:
+            name (str): Name of the texture to remove.
+        """
+        self.textures.pop(name, None)
+
+    def rename(self, name, new_name):
+        """
+        Renames a texture.
+
+        Args:
+            name (str): Current texture name.
+            new_name (str): New texture name.
+        """
+        texture = self.textures.pop(name)
+        self.textures[new_name] = texture.renamed(new_name)
+
+    def export(self, names, out_dir, progress=None):
+        """
+        Writes textures as PNG files.
+
+        Args:
+            names (list): Names of the textures to export.
+            out_dir (str): Destination directory.
+            progress (callable, optional): Called with the textures done and the
+                total after every texture, raising in it stops the export.
+
+        Returns:
+            list: Paths of the written files.
+        """
+        paths = []
+        for name in names:
+            paths.append(self.textures[name].save(os.path.join(out_dir, f"{name}.png")))
+            if progress:
+                progress(len(paths), len(names))
+
+        return paths
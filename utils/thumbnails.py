@@ -0,0 +1,287 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=broad-exception-caught
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from utils.profiling import span
+
+# thumbnail sizes, same as the zoom steps
+LEVELS = tuple(range(16, 129, 16))
+
+
+def texture_image(texture):
+    """
+    Converts a texture to an indexed QImage without going through PIL.
+
+    Args:
+        texture (Texture): Texture to convert.
+
+    Returns:
+        QImage: The texture as an 8-bit indexed image.
+    """
+    image = QImage(
+        texture.pixels,
+        texture.width,
+        texture.height,
+        texture.width,
+        QImage.Format_Indexed8,
+    )
+
+    palette = texture.palette
+    image.setColorTable(
+        [
+            0xFF000000 | (palette[i] << 16) | (palette[i + 1] << 8) | palette[i + 2]
+            for i in range(0, 768, 3)
+        ]
+    )
+
+    # detach from the pixel buffer we don't own
+    return image.copy()
+
+
+def pyramid_level(size):
+    """
+    Args:
+        size (int): Wanted thumbnail size.
+
+    Returns:
+        int: The closest thumbnail size in LEVELS.
+    """
+    return min(LEVELS, key=lambda level: abs(level - size))
+
+
+def scaled_thumbnail(image, size):
+    """
+    Args:
+        image (QImage): Full size texture image.
+        size (int): Maximum thumbnail width and height.
+
+    Returns:
+        QImage: The scaled thumbnail.
+    """
+    return image.scaled(size, size, Qt.KeepAspectRatio, Qt.FastTransformation)
+
+
+class ThumbnailCache:
+    """
+    Least recently used thumbnails, up to a memory budget.
+    """
+
+    def __init__(self, budget):
+        """
+        Args:
+            budget (int): Maximum size of the cached images, in bytes.
+        """
+        self.budget = budget
+        self.used = 0
+        self.images = OrderedDict()
+        self.levels = {}  # digest -> cached sizes
+
+    def __contains__(self, key):
+        return key in self.images
+
+    def __len__(self):
+        return len(self.images)
+
+    def get(self, key):
+        """
+        Args:
+            key (tuple): Texture digest and thumbnail size.
+
+        Returns:
+            QImage: The cached thumbnail, or None.
+        """
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+
+        return image
+
+    def nearest(self, digest, size):
+        """
+        Args:
+            digest (str): Texture digest.
+            size (int): Wanted thumbnail size.
+
+        Returns:
+            QImage: The cached thumbnail of the texture closest to `size`,
+                preferring bigger ones, or None.
+        """
+        sizes = self.levels.get(digest)
+        if not sizes:
+            return None
+
+        best = min(sizes, key=lambda s: (abs(s - size), s < size))
+        return self.images[(digest, best)]
+
+    def put(self, key, image):
+        """
+        Caches a thumbnail, evicting the least recently used ones over the budget.
+
+        Args:
+            key (tuple): Texture digest and thumbnail size.
+            image (QImage): The thumbnail.
+        """
+        if key in self.images:
+            self.used -= self.images.pop(key).sizeInBytes()
+
+        self.images[key] = image
+        self.used += image.sizeInBytes()
+        self.levels.setdefault(key[0], set()).add(key[1])
+
+        while self.used > self.budget and len(self.images) > 1:
+            (digest, size), evicted = self.images.popitem(last=False)
+            self.used -= evicted.sizeInBytes()
+
+            self.levels[digest].discard(size)
+            if not self.levels[digest]:
+                del self.levels[digest]
+
+    def clear(self):
+        """Drops every thumbnail."""
+        self.images.clear()
+        self.levels.clear()
+        self.used = 0
+
+
+class _RenderTask(QRunnable):
+    """
+    Renders thumbnails of one texture, at one or more sizes, on the thread pool.
+    """
+
+    def __init__(self, service, texture, keys):
+        super().__init__()
+        self.service = service
+        self.texture = texture
+        self.keys = keys
+
+    def run(self):
+        self.service.queued.difference_update(self.keys)
+
+        with span("thumbnails.render"):
+            try:
+                image = texture_image(self.texture)
+            except Exception as e:
+                print(f"[ThumbnailService] {self.texture.name}: {e}")
+                image = None
+
+            thumbnails = [
+                (key, QImage() if image is None else scaled_thumbnail(image, key[1]))
+                for key in self.keys
+            ]
+
+        # null images are cached as well, so broken textures aren't retried
+        for key, thumbnail in thumbnails:
+            self.service.rendered.emit(key, thumbnail)
+
+
+class ThumbnailService(QObject):
+    """
+    Renders texture thumbnails on a thread pool and keeps them in an LRU cache
+    keyed by texture content and size. `ready` is emitted whenever a requested
+    thumbnail is done.
+
+    Every texture gets a pyramid of thumbnails, one per zoom step in LEVELS.
+    Levels are rendered on demand, together with the ones next to them, so a
+    zoom step usually finds its level already cached. Until a level is ready,
+    the closest cached one stands in for it.
+    """
+
+    rendered = pyqtSignal(object, object)
+    ready = pyqtSignal()
+
+    def __init__(self, budget=64 * 1024 * 1024, parent=None):
+        """
+        Args:
+            budget (int, optional): Memory budget of the cache, in bytes.
+            parent (QObject, optional): Parent object.
+        """
+        super().__init__(parent)
+        self.cache = ThumbnailCache(budget)
+        self.pending = set()  # queued or rendering
+        self.queued = set()  # not started yet
+        self.pool = QThreadPool(self)
+
+        # queued, rendered is emitted from worker threads
+        self.rendered.connect(self.store)
+
+    def get(self, texture, size):
+        """
+        Returns a thumbnail from the cache, or queues it for rendering.
+
+        Args:
+            texture (Texture): Texture to render.
+            size (int): Maximum thumbnail width and height, snapped to LEVELS.
+
+        Returns:
+            QImage: The thumbnail (null if the texture couldn't be rendered), a
+                cached thumbnail of a different size while it renders, or None
+                if there's none yet.
+        """
+        digest = texture.digest
+        size = pyramid_level(size)
+
+        index = LEVELS.index(size)
+        keys = [
+            (digest, level)
+            for level in LEVELS[max(index - 1, 0) : index + 2]
+            if (digest, level) not in self.cache and (digest, level) not in self.pending
+        ]
+        if keys:
+            # the wanted level first, the neighbours are a bonus
+            keys.sort(key=lambda k: k[1] != size)
+            priority = 1 if keys[0][1] == size else 0
+
+            self.pending.update(keys)
+            self.queued.update(keys)
+            self.pool.start(_RenderTask(self, texture, keys), priority)
+
+        image = self.cache.get((digest, size))
+        if image is not None:
+            return image
+
+        return self.cache.nearest(digest, size)
+
+    def transform(self, texture, result, func):
+        """
+        Derives the cached thumbnails of an edited texture from the ones of the
+        original, for edits that only move pixels around (flips, rotations).
+
+        Args:
+            texture (Texture): Texture before the edit.
+            result (Texture): Texture after the edit.
+            func (callable): Applies the same edit to a QImage.
+        """
+        digest, new_digest = texture.digest, result.digest
+
+        for size in list(self.cache.levels.get(digest, ())):
+            image = self.cache.get((digest, size))
+            if image is not None and not image.isNull():
+                self.cache.put((new_digest, size), func(image))
+
+    def store(self, key, image):
+        """Caches a rendered thumbnail and lets the view know."""
+        self.cache.put(key, image)
+        self.pending.discard(key)
+        self.ready.emit()
+
+    def cancel(self):
+        """Forgets queued renders that didn't start yet, e.g. after scrolling past them."""
+        self.pool.clear()
+        self.pending -= self.queued
+        self.queued.clear()
+
+    def clear(self):
+        """
+        Cancels queued renders and drops every cached thumbnail, e.g. when
+        another WAD is opened.
+        """
+        self.cancel()
+        self.cache.clear()
+
+    def shutdown(self):
+        """Cancels queued renders and waits for the running ones."""
+        self.cancel()
+        self.pool.waitForDone()
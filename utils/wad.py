@@ -3,330 +3,447 @@
 # pylint: disable=too-many-locals
 import os, sys
 
-from io import BytesIO
-from array import array
-from struct import unpack
+from struct import pack
 
+import numpy as np
 from PIL import Image
 
-from vgio import quake
-from vgio import halflife
-from vgio.quake import lmp
-from vgio.quake import wad as wad2
-from vgio.halflife import wad as wad3
+from utils.pool import parallel_imap, worker_count
+from utils.profiling import timed
+from utils.quantize import quantize, remap_table
+from utils.resize import mip_levels
+from utils.texture_store import Texture, QUAKE_PALETTE
+from utils.wadreader import open_wad, LUMP_TYPES, MIPTEX_HL, MIPTEX_QUAKE
+from utils.wadwriter import WadWriter, miptex_lump
 
 
-def unwad(wad_path, temp_dir):
+@timed("wad.unwad")
+def unwad(wad_path, lazy=False, workers=1):
     """
-    Extracts contents of a WAD file to PNG files and returns texture names.
+    Reads the textures of a WAD file.
 
     Args:
         wad_path (str): Path to the WAD file.
-        temp_dir (str): Path to the TEMP folder, where we extract the textures.
+        lazy (bool, optional): If True, only the WAD directory is read and each
+            texture decodes its pixels the first time they're used.
+        workers (int, optional): Worker processes to decode with when not lazy.
+            0 means one per CPU core.
 
     Returns:
-        tuple: A tuple containing the path to the temporary directory where contents are extracted
-               and a list of texture names extracted from the WAD file.
-    """
-
-    wad = wad2
-    is_wad3 = False
-
-    if get_wad_type(wad_path) == "HL":
-        wad = wad3
-        is_wad3 = True
-
-    print(wad.WadInfo(wad_path).compression)
-
-    if not wad.is_wadfile(wad_path):
-        raise ValueError(f"Invalid WAD file: {wad_path}")
-
-    texture_names = []
-
-    # flatten out palette
-    palette = []
-    for p in quake.palette:
-        palette += p
-
-    with wad.WadFile(wad_path) as wad_file:
-        for item in wad_file.infolist():
-            filename = item.filename
-            fullpath = os.path.join(temp_dir, filename)
-            fullpath_ext = "{0}.png".format(fullpath)
-
-            # check if duplicate
-            count = 1
-            while os.path.exists(fullpath_ext):
-                # append suffix
-                filename, ext = os.path.splitext(filename)
-                fullpath_ext = f"{os.path.join(temp_dir, filename)} ({count}){ext}"
-                fullpath_ext = "{0}.png".format(fullpath_ext)  # Update fullpath_ext
-                count += 1
-
-            # add texture name to the list
-            texture_names.append(os.path.splitext(os.path.basename(fullpath_ext))[0])
-
-            data = None
-            size = None
-
-            # pictures
-            if item.type == wad.LumpType.QPIC:
-                with wad_file.open(filename) as lmp_file:
-                    lump = lmp.Lmp.open(lmp_file)
-                    size = lump.width, lump.height
-                    data = array("B", lump.pixels)
-
-            # special cases
-            elif item.type == wad.LumpType.MIPTEX:
-                try:
-                    with wad_file.open(filename) as mip_file:
-                        mip = wad.Miptexture.read(mip_file)
-                        data = mip.pixels[: mip.width * mip.height]
-                        data = array("B", data)
-                        size = mip.width, mip.height
-
-                        # for WAD3, use embedded palette from miptexture
-                        if is_wad3 and mip.palette:
-                            palette = list(mip.palette)
-                        else:
-                            palette = []
-                            for p in quake.palette:
-                                palette += p
-                except Exception as e:
-                    print(f"Failed to extract resource: {filename}", file=sys.stderr)
-                    continue
-            try:
-                # convert to image file
-                if data is not None and size is not None:
-                    img = Image.frombuffer("P", size, data, "raw", "P", 0, 1)
-                    img.putpalette(palette)
-                    img.save(fullpath_ext)
-                else:
-                    wad_file.extract(filename, temp_dir)
-            except Exception as e:
-                print(f"Error: {e}", file=sys.stderr)
-
-    return temp_dir, texture_names
-
-
-def wadup(in_paths, out_path):
-    """
-    Creates a WAD2 file from PNG texture images.
+        list: Textures in WAD directory order. Names are not deduplicated.
+    """
+    if lazy:
+        return open_wad(wad_path).textures()
+
+    return unwad_many([wad_path], workers)[0]
+
+
+@timed("wad.unwad_many")
+def unwad_many(wad_paths, workers=0):
+    """
+    Fully decodes several WAD files, spreading their lumps over a process pool.
 
     Args:
-        in_paths (list): List of paths to PNG texture files.
-        out_path (str): Output path for the WAD file.
+        wad_paths (list): Paths to the WAD files.
+        workers (int, optional): Number of worker processes. 0 means one per CPU core.
 
-    Notes:
-        - Converts images to Quake palette
-        - Generates mipmaps for each texture
-        - Creates MIPTEX lumps in WAD format
+    Returns:
+        list: One list of textures per WAD, in WAD directory order. Decoded
+            textures own their pixels, nothing keeps the WADs open.
     """
+    textures = [[] for _ in wad_paths]
+    for index, chunk, _, _ in iter_unwad(wad_paths, workers):
+        textures[index].extend(chunk)
 
-    wad = wad2
+    return textures
 
-    # ensure output directory structure
-    out_dir = os.path.dirname(out_path) or "."
-    os.makedirs(out_dir, exist_ok=True)
 
-    # making the palette
-    palette = []
-    for p in quake.palette:
-        palette += p
+def iter_unwad(wad_paths, workers=0):
+    """
+    Fully decodes several WAD files like unwad_many, yielding the textures in
+    chunks as soon as they're decoded.
+
+    Args:
+        wad_paths (list): Paths to the WAD files.
+        workers (int, optional): Number of worker processes. 0 means one per CPU core.
+
+    Yields:
+        tuple: Index of the WAD in `wad_paths`, a list of textures, and the
+            number of lumps done so far out of the total, in directory order.
+    """
+    # split every WAD directory into chunks, so a single big WAD still spreads out,
+    # small imports end up as a single chunk and skip the pool start-up cost
+    jobs = []
+    for index, wad_path in enumerate(wad_paths):
+        try:
+            lump_count = len(open_wad(wad_path).entries)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            continue
+
+        step = max(256, -(-lump_count // worker_count(workers)))
+        for start in range(0, lump_count, step):
+            jobs.append((index, wad_path, start, min(start + step, lump_count)))
+
+    total = sum(job[3] - job[2] for job in jobs)
+    done = 0
+
+    results = parallel_imap(_decode_lumps, [job[1:] for job in jobs], workers)
+    for job, chunk in zip(jobs, results):
+        done += job[3] - job[2]
+        yield job[0], chunk, done, total
+
+
+def _decode_lumps(job):
+    """
+    Decodes a slice of a WAD directory, runs in a worker process.
 
-    palette_image = Image.frombytes("P", (16, 16), bytes(palette))
-    palette_image.putpalette(palette)
+    Args:
+        job (tuple): WAD path, first and last (exclusive) directory index.
 
-    # making the WAD itself
-    with wad.WadFile(out_path, "w") as wad_file:
-        for file_path in in_paths:
-            if file_path.endswith(".png"):
-                try:
-                    # process the image
-                    with Image.open(file_path).convert(mode="RGB") as img:
-                        img = img.quantize(palette=palette_image)
+    Returns:
+        list: Decoded textures, detached from the WAD so they can be pickled.
+    """
+    wad_path, start, stop = job
+    reader = open_wad(wad_path)
+
+    textures = []
+    for entry in reader.entries[start:stop]:
+        if entry.type not in LUMP_TYPES:
+            continue
+
+        try:
+            width, height, pixels, palette = reader.decode(entry)
+        except Exception as e:
+            print(f"Failed to extract resource: {entry.name}", file=sys.stderr)
+            continue
+
+        textures.append(
+            Texture(
+                entry.name,
+                width,
+                height,
+                bytes(pixels),
+                bytes(palette),
+                LUMP_TYPES[entry.type],
+                info=reader.info(entry),
+            )
+        )
 
-                        name = os.path.basename(file_path).split(".")[0]
+    return textures
 
-                        mip = wad.Miptexture()
-                        mip.name = name
-                        mip.width = img.width
-                        mip.height = img.height
-                        mip.offsets = [40]
-                        mip.pixels = []
 
-                        # mipmap pics up them
-                        for i in range(4):
-                            resized_image = img.resize(
-                                (img.width // pow(2, i), img.height // pow(2, i))
-                            )
-                            data = resized_image.tobytes()
-                            mip.pixels += unpack(f"<{len(data)}B", data)
-                            if i < 3:
-                                mip.offsets += [mip.offsets[-1] + len(data)]
+def _encode_miptex(texture):
+    """
+    Quantizes a texture to the Quake palette and encodes it as a WAD2 MIPTEX lump.
+    Runs on a worker process, so it only takes and returns picklable values.
 
-                        buff = BytesIO()
-                        wad.Miptexture.write(buff, mip)
-                        buff.seek(0)
+    Args:
+        texture (Texture): Texture to encode.
 
-                        info = wad.WadInfo(name)
-                        info.file_size = 40 + len(mip.pixels)
-                        info.disk_size = info.file_size
-                        info.compression = wad.CompressionType.NONE
-                        info.type = wad.LumpType.MIPTEX
+    Returns:
+        tuple: Texture name and the lump data, or None if it couldn't be encoded.
+    """
+    try:
+        # process the image, textures already in the quake palette keep their indices
+        with texture.to_image() as img:
+            if texture.palette != QUAKE_PALETTE:
+                img = quantize(img)
 
-                        print(f"Adding: {file_path}")
+            levels = mip_levels(img, texture.name.startswith("{"))
 
-                        wad_file.writestr(info, buff)
+            return texture.name, miptex_lump(
+                texture.name, img.width, img.height, levels
+            )
 
-                except Exception as e:
-                    print(f"Error processing {file_path}: {e}")
+    except Exception as e:
+        print(f"Error processing {texture.name}: {e}")
+        return None
 
 
-def wadup_hl(in_paths, out_path):
+def _encode_miptex_hl(texture):
     """
-    Creates a WAD3 file from PNG texture images.
+    Quantizes a texture to its own palette and encodes it as a WAD3 MIPTEX lump.
+    Runs on a worker process, so it only takes and returns picklable values.
 
     Args:
-        in_paths (list): List of paths to PNG texture files.
-        out_path (str): Output path for the WAD file.
+        texture (Texture): Texture to encode.
 
-    Notes:
-        - Converts images to Quake palette
-        - Generates mipmaps for each texture
-        - Creates MIPTEX lumps in WAD format
+    Returns:
+        tuple: Texture name and the lump data, or None if it couldn't be encoded.
     """
+    try:
+        img = texture.to_image().convert("RGB")
+
+        img_quantized = img.quantize(colors=256)
+
+        # convert to 768 bytes (256 RGB colors)
+        palette_list = img_quantized.getpalette() or []
+        if len(palette_list) < 768:
+            palette_list = palette_list + [0] * (768 - len(palette_list))
+        palette_bytes = bytes(palette_list[:768])
+
+        palette_image = Image.new("P", (16, 16))
+        palette_image.putpalette(palette_bytes)
+
+        levels = []
+        for i in range(4):
+            resized = img.resize((img.width // pow(2, i), img.height // pow(2, i)))
+            levels.append(resized.quantize(palette=palette_image).tobytes())
+
+        return texture.name, miptex_lump(
+            texture.name, img.width, img.height, levels, palette_bytes
+        )
+
+    except Exception as e:
+        print(f"Error processing {texture.name}: {e}")
+        return None
+
+
+def _copy_miptex(texture, is_wad3):
+    """
+    Copies the lump of a texture that didn't change since it was read from a WAD,
+    skipping the decode, quantize and mipmap steps.
+
+    Args:
+        texture (Texture): Texture to copy.
+        is_wad3 (bool): Whether the lump goes to a WAD3 file.
+
+    Returns:
+        tuple: Lump name and the lump data as a list of chunks viewing the
+            source WAD, or None if the texture has to be encoded (edited,
+            imported, or from a different kind of lump). Unrenamed lumps keep
+            the name bytes of the source, even ones that aren't ASCII.
+    """
+    if texture.source is None:
+        return None
+
+    reader, entry = texture.source
+    lump_type = MIPTEX_HL if is_wad3 else MIPTEX_QUAKE
+    if reader.is_wad3 != is_wad3 or entry.type != lump_type or entry.compression:
+        return None
+
+    data = reader.read(entry)
+
+    # renaming keeps the source, the name in the miptex header needs updating
+    if entry.name != texture.name:
+        try:
+            header_name = pack("<16s", texture.name.encode("ascii"))
+        except UnicodeEncodeError:
+            # left to the encoder, which skips it like any texture it can't write
+            return None
+
+        return texture.name, [header_name, data[16:]]
+
+    return entry.raw_name, [data]
+
+
+def _encode_lumps(textures, encode, is_wad3, workers):
+    """
+    Copies unchanged lumps and encodes the rest on a process pool.
+
+    Args:
+        textures (list): List of Texture objects.
+        encode (callable): Module-level encoder for changed textures.
+        is_wad3 (bool): Whether the lumps go to a WAD3 file.
+        workers (int): Number of processes encoding textures. 0 means one per CPU core.
+
+    Yields:
+        (name, data) tuples or None, in the order of `textures`, as soon as
+            they're ready.
+    """
+    textures = [t for t in textures if t]
+    copies = [_copy_miptex(t, is_wad3) for t in textures]
+
+    encoded = parallel_imap(
+        encode, [t for t, lump in zip(textures, copies) if lump is None], workers
+    )
+    for lump in copies:
+        yield lump if lump is not None else next(encoded)
+
+
+def _write_wad(textures, out_path, encode, is_wad3, workers, progress=None):
+    """
+    Streams encoded MIPTEX lumps into a new WAD file, in order.
+
+    Args:
+        textures (list): List of Texture objects.
+        out_path (str): Output path for the WAD file.
+        encode (callable): Module-level encoder for changed textures.
+        is_wad3 (bool): Whether to write a WAD3 file.
+        workers (int): Number of processes encoding textures. 0 means one per CPU core.
+        progress (callable, optional): Called with the lumps done and the total
+            after every lump. An exception raised by it aborts the save and
+            leaves `out_path` as it was.
+    """
+    # ensure output directory structure
     out_dir = os.path.dirname(out_path) or "."
     os.makedirs(out_dir, exist_ok=True)
 
-    with wad3.WadFile(out_path, "w") as wad_file:
-        for file_path in in_paths:
-            if file_path.endswith(".png"):
-                try:
-                    img = Image.open(file_path).convert("RGB")
+    textures = [t for t in textures if t]
 
-                    name = os.path.basename(file_path).split(".")[0]
+    with WadWriter(out_path, is_wad3) as wad_file:
+        lumps = _encode_lumps(textures, encode, is_wad3, workers)
+        for done, (texture, lump) in enumerate(zip(textures, lumps), 1):
+            if lump is not None:
+                name, data = lump
+                print(f"Adding: {texture.name}")
+                wad_file.add(name, data)
 
-                    img_quantized = img.quantize(colors=256)
+            if progress:
+                progress(done, len(textures))
 
-                    # convert to 768 bytes (256 RGB colors)
-                    palette_list = img_quantized.getpalette() or []
-                    if len(palette_list) < 768:
-                        palette_list = palette_list + [0] * (768 - len(palette_list))
-                    palette_bytes = bytes(palette_list[:768])
 
-                    palette_image = Image.new("P", (16, 16))
-                    palette_image.putpalette(palette_bytes)
-
-                    mip = wad3.Miptexture(name, img.width, img.height)
-                    mip.pixels = b""
-                    mip.palette = palette_bytes
+@timed("wad.wadup")
+def wadup(textures, out_path, workers=1, progress=None):
+    """
+    Creates a WAD2 file from textures.
 
-                    offset = 40
-                    offsets = [offset]
-                    for i in range(4):
-                        resized = img.resize(
-                            (img.width // pow(2, i), img.height // pow(2, i))
-                        )
-                        resized_quantized = resized.quantize(palette=palette_image)
-                        mip.pixels += resized_quantized.tobytes()
-                        if i < 3:
-                            offset += resized.width * resized.height
-                            offsets.append(offset)
-                    mip.offsets = tuple(offsets)
+    Args:
+        textures (list): List of Texture objects.
+        out_path (str): Output path for the WAD file.
+        workers (int, optional): Number of processes encoding textures. 0 means one per CPU core.
+        progress (callable, optional): Called with the lumps done and the total
+            after every lump, raising in it cancels the save.
 
-                    buff = BytesIO()
-                    wad3.Miptexture.write(buff, mip)
-                    buff.seek(0)
-                    buff_size = buff.getbuffer().nbytes
+    Notes:
+        - Converts images to Quake palette
+        - Generates mipmaps for each texture
+        - Creates MIPTEX lumps in WAD format
+        - Lumps of textures unchanged since they were read are copied as they are
+    """
+    _write_wad(textures, out_path, _encode_miptex, False, workers, progress)
 
-                    info = wad3.WadInfo(name)
-                    info.file_size = buff_size
-                    info.disk_size = buff_size
-                    info.compression = wad3.CompressionType.NONE
-                    info.type = wad3.LumpType.MIPTEX
 
-                    print(f"Adding: {file_path}")
+@timed("wad.wadup_hl")
+def wadup_hl(textures, out_path, workers=1, progress=None):
+    """
+    Creates a WAD3 file from textures.
 
-                    wad_file.writestr(info, buff)
+    Args:
+        textures (list): List of Texture objects.
+        out_path (str): Output path for the WAD file.
+        workers (int, optional): Number of processes encoding textures. 0 means one per CPU core.
+        progress (callable, optional): Called with the lumps done and the total
+            after every lump, raising in it cancels the save.
 
-                except Exception as e:
-                    print(f"Error processing {file_path}: {e}")
+    Notes:
+        - Converts images to Quake palette
+        - Generates mipmaps for each texture
+        - Creates MIPTEX lumps in WAD format
+        - Lumps of textures unchanged since they were read are copied as they are
+    """
+    _write_wad(textures, out_path, _encode_miptex_hl, True, workers, progress)
 
 
-def flip_texture(texture_path, mirror=False):
+def _transform_textures(textures, transform):
     """
-    Flips a texture image either horizontally or vertically.
+    Applies a pixel transform to many textures at once, straight on their
+    palette indices. Textures of the same size go through it as one array.
 
     Args:
-        texture_path (str): Path to the texture image file.
-        mirror (bool, optional): If True, flips horizontally. If False, flips vertically. Defaults to False.
+        textures (list): Texture objects.
+        transform (callable): Takes an (n, height, width) array of indices and
+            returns the transformed array.
+
+    Returns:
+        list: New Texture objects, in the order of `textures`.
     """
-    img = Image.open(texture_path)
+    groups = {}
+    for i, texture in enumerate(textures):
+        groups.setdefault(texture.size, []).append(i)
+
+    results = [None] * len(textures)
+    for (width, height), indices in groups.items():
+        stack = np.stack(
+            [
+                np.frombuffer(textures[i].pixels, np.uint8).reshape(height, width)
+                for i in indices
+            ]
+        )
+
+        for i, pixels in zip(indices, transform(stack)):
+            texture = textures[i]
+            results[i] = Texture(
+                texture.name,
+                pixels.shape[1],
+                pixels.shape[0],
+                pixels.tobytes(),
+                bytes(texture.palette),
+                texture.lump_type,
+            )
 
-    if mirror:
-        flipped = img.transpose(Image.FLIP_LEFT_RIGHT)
-    else:
-        flipped = img.transpose(Image.FLIP_TOP_BOTTOM)
+    return results
 
-    flipped.save(texture_path)
 
-    flipped.close()
-    img.close()
+def flip_textures(textures, mirror=False):
+    """
+    Flips textures either horizontally or vertically, keeping their palette indices.
 
+    Args:
+        textures (list): Textures to flip.
+        mirror (bool, optional): If True, flips horizontally. If False, flips vertically. Defaults to False.
 
-def rotate_texture(texture_path, to_right=False):
+    Returns:
+        list: The flipped textures.
     """
-    Rotates a texture image 90 degrees clockwise or counterclockwise.
+    return _transform_textures(textures, lambda a: np.flip(a, 2 if mirror else 1))
+
+
+def rotate_textures(textures, to_right=False):
+    """
+    Rotates textures 90 degrees clockwise or counterclockwise, keeping their
+    palette indices. Non-square textures swap their width and height.
 
     Args:
-        texture_path (str): Path to the texture image file.
+        textures (list): Textures to rotate.
         to_right (bool, optional): If True, rotates 90° clockwise. If False, rotates 90° counterclockwise. Defaults to False.
+
+    Returns:
+        list: The rotated textures.
     """
-    img = Image.open(texture_path)
+    return _transform_textures(
+        textures, lambda a: np.rot90(a, -1 if to_right else 1, axes=(1, 2))
+    )
 
-    if to_right:
-        rotated = img.rotate(-90)
-    else:
-        rotated = img.rotate(90)
 
-    rotated.save(texture_path)
+def flip_texture(texture, mirror=False):
+    """
+    Flips a texture either horizontally or vertically.
 
-    rotated.close()
-    img.close()
+    Args:
+        texture (Texture): Texture to flip.
+        mirror (bool, optional): If True, flips horizontally. If False, flips vertically. Defaults to False.
+
+    Returns:
+        Texture: The flipped texture.
+    """
+    return flip_textures([texture], mirror)[0]
 
 
-def import_texture(images, temp_dir):
+def rotate_texture(texture, to_right=False):
     """
-    Processes and imports texture images with Quake palette constraints.
+    Rotates a texture 90 degrees clockwise or counterclockwise.
 
     Args:
-        images (list): List of paths to image files.
-        temp_dir (str): Directory to store processed textures.
+        texture (Texture): Texture to rotate.
+        to_right (bool, optional): If True, rotates 90° clockwise. If False, rotates 90° counterclockwise. Defaults to False.
 
     Returns:
-        list: Paths to the processed texture files.
-
-    Notes:
-        - Resizes images to multiples of 16
-        - Maximum dimension of 512 pixels while preserving aspect ratio
-        - Handles transparency by converting to RGB with palette background
-        - Quantizes colors to Quake palette
-        - Adds '{' prefix for textures with alpha channel
+        Texture: The rotated texture.
     """
-    has_alpha = False
+    return rotate_textures([texture], to_right)[0]
 
-    # quake palette
-    palette = []
-    for p in quake.palette:
-        palette += p
 
-    palette_image = Image.frombytes("P", (16, 16), bytes(palette))
-    palette_image.putpalette(palette)
+def _import_image(path):
+    """
+    Args:
+        path (str): Path to an image file.
 
-    new_paths = []
-    for i in images:
-        img = Image.open(i)
+    Returns:
+        Texture: The image as a texture in the Quake palette.
+    """
+    with Image.open(path) as img:
         x, y = img.size
 
         # make sure we can divide the size by 16
@@ -347,115 +464,123 @@ def import_texture(images, temp_dir):
             new_width = (new_width // 16) * 16
             new_height = (new_height // 16) * 16
 
+        # big JPEGs decode straight to a fraction of their size, still above the new one
+        img.draft("RGB", (new_width, new_height))
+
         # resize if needed
-        if x != new_width or y != new_height:
-            img = img.resize((new_width, new_height), Image.LANCZOS)
+        if img.size != (new_width, new_height):
+            img = img.resize((new_width, new_height), Image.LANCZOS, reducing_gap=3.0)
 
         # handle transparency
-        if img.mode == "RGBA":
-            has_alpha = True
+        has_alpha = img.mode == "RGBA"
+        if has_alpha:
             background = Image.new(
-                "RGBA", img.size, tuple(palette[-3:]) + (255,)
+                "RGBA", img.size, tuple(QUAKE_PALETTE[-3:]) + (255,)
             )  # RGB + alpha color
             img = Image.alpha_composite(background, img)
 
-        img = img.convert("RGB")
-        img = img.quantize(palette=palette_image)
+        img = quantize(img)
 
-        base_name = os.path.splitext(os.path.basename(i))[0]
+    base_name = os.path.splitext(os.path.basename(path))[0]
 
-        # alpha texture prefix
-        if has_alpha:
-            base_name = "{" + base_name
-
-        # dealing with duplicate names
-        index = 1
-        new_path = f"{temp_dir}/{base_name}.png"
-        while os.path.exists(new_path):
-            new_path = f"{temp_dir}/{base_name} ({index}).png"
-            index += 1
+    # alpha texture prefix
+    if has_alpha:
+        base_name = "{" + base_name
 
-        # save image
-        img.save(new_path, format="PNG")
-        img.close()
-        new_paths.append(new_path)
-    return new_paths
+    return Texture.from_image(base_name, img)
 
 
-def defullbright(images, overwrite=False):
+@timed("wad.import_texture")
+def import_texture(images):
     """
-    Removes fullbright colors from texture images.
+    Processes and imports texture images with Quake palette constraints.
 
     Args:
-        images (list): List of paths to texture image files.
-        overwrite (bool): If True, files will be overwriten and '-dfb' suffix won't be added.
+        images (list): List of paths to image files.
 
     Returns:
-        list: Paths to processed images with '-dfb' suffix.
+        list: The imported Texture objects. Names are not deduplicated,
+            images that can't be read are left out.
 
     Notes:
-        - Uses reduced Quake palette (colors 0-223 plus last color)
-        - Quantizes images to remove fullbright colors (224-254)
+        - Resizes images to multiples of 16
+        - Maximum dimension of 512 pixels while preserving aspect ratio
+        - Handles transparency by converting to RGB with palette background
+        - Quantizes colors to Quake palette
+        - Adds '{' prefix for textures with alpha channel
     """
+    textures = []
+    for i in images:
+        try:
+            textures.append(_import_image(i))
+        except Exception as e:
+            print(f"[import_texture] {i}: {e}")
 
-    # quake palette
-    full_palette = []
-    for p in quake.palette:
-        full_palette += p
-
-    # removed fullbrights
-    reduced_palette = full_palette[: 224 * 3] + full_palette[-3:]
-
-    palette_image = Image.frombytes("P", (225, 1), bytes(reduced_palette))
-    palette_image.putpalette(
-        reduced_palette + [0] * (256 - 225) * 3
-    )  # pad fullbright colors with zeros
-
-    new_paths = []
-    for img_path in images:
-        img = Image.open(img_path).convert("RGB")
-        img = img.quantize(palette=palette_image)
+    return textures
 
-        base_name, ext = os.path.splitext(os.path.basename(img_path))
 
-        # overwrite
-        if overwrite:
-            new_path = os.path.join(os.path.dirname(img_path), f"{base_name}{ext}")
-        else:
-            new_path = os.path.join(os.path.dirname(img_path), f"{base_name}-dfb{ext}")
+# quake colors without the fullbrights (224-254) and the transparent color (255)
+_LIT_PALETTE = QUAKE_PALETTE[: 224 * 3]
 
-        # dealing with duplicate names
-        index = 1
-        while os.path.exists(new_path):
-            if overwrite:
-                break
 
-            new_path = os.path.join(
-                os.path.dirname(img_path), f"{base_name}-dfb ({index}).png"
-            )
-            index += 1
+def _defullbright_table(texture):
+    """
+    Args:
+        texture (Texture): Texture to defullbright.
 
-        img.save(new_path, format="PNG")
-        img.close()
+    Returns:
+        bytes: Index -> Quake palette index table taking out fullbright colors.
+    """
+    table = bytearray(remap_table(texture.palette, _LIT_PALETTE))
 
-        if not overwrite:
-            new_paths.append(new_path)
+    if texture.palette == QUAKE_PALETTE:
+        # lit colors keep their index, even where the palette repeats a color
+        table[:224] = range(224)
+    if texture.palette == QUAKE_PALETTE or texture.name.startswith("{"):
+        table[255] = 255  # transparent
 
-    return new_paths
+    return bytes(table)
 
 
-def get_texture_size(image_path):
+@timed("wad.defullbright")
+def defullbright(textures, overwrite=False):
     """
-    Returns the dimensions of a texture image.
+    Removes fullbright colors from textures.
 
     Args:
-        image_path (str): Path to the texture image file.
+        textures (list): List of Texture objects.
+        overwrite (bool): If True, textures keep their names and '-dfb' suffix won't be added.
 
     Returns:
-        tuple: Width and height of the image in pixels.
+        list: The processed Texture objects. Names are not deduplicated.
+
+    Notes:
+        - Fullbright colors (224-254) become the nearest of colors 0-223
+        - Textures are remapped index to index through a 256-entry table,
+          the results are in the Quake palette
     """
-    with Image.open(image_path) as img:
-        return img.size
+    new_textures = []
+    for texture in textures:
+        pixels = bytes(texture.pixels).translate(_defullbright_table(texture))
+
+        # overwrite
+        if overwrite:
+            new_name = texture.name
+        else:
+            new_name = f"{texture.name}-dfb"
+
+        new_textures.append(
+            Texture(
+                new_name,
+                texture.width,
+                texture.height,
+                pixels,
+                QUAKE_PALETTE,
+                texture.lump_type,
+            )
+        )
+
+    return new_textures
 
 
 def get_wad_type(file_path):
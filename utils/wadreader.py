@@ -0,0 +1,286 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=too-few-public-methods
+# pylint: disable=multiple-imports
+import os, mmap, struct, threading
+from itertools import count
+from weakref import WeakSet, WeakValueDictionary
+
+from utils.texture_store import Texture, TextureInfo, QUAKE_PALETTE
+
+HEADER = struct.Struct("<4s2i")
+ENTRY = struct.Struct("<3i2B2x16s")
+MIPTEX_HEADER = struct.Struct("<16s6I")
+QPIC_HEADER = struct.Struct("<2i")
+
+# lump types, as stored in the WAD directory
+QPIC = 0x42
+MIPTEX_HL = 0x43
+MIPTEX_QUAKE = 0x44
+
+LUMP_TYPES = {
+    QPIC: "QPIC",
+    MIPTEX_HL: "MIPTEX",
+    MIPTEX_QUAKE: "MIPTEX",
+}
+
+# open readers, so every texture coming from the same file shares one index
+_readers = WeakValueDictionary()
+
+# reader serial numbers, unlike id() they're never reused within a process
+_serials = count()
+
+
+class WadEntry:
+    """
+    A single lump in the WAD directory.
+    """
+
+    __slots__ = (
+        "name",
+        "raw_name",
+        "offset",
+        "disk_size",
+        "size",
+        "type",
+        "compression",
+    )
+
+    def __init__(self, offset, disk_size, size, type_, compression, name):
+        self.name = name.split(b"\x00")[0].decode("ascii", "replace")
+        self.raw_name = name  # as stored, for lumps copied to another WAD
+        self.offset = offset
+        self.disk_size = disk_size
+        self.size = size
+        self.type = type_
+        self.compression = compression
+
+
+class WadReader:
+    """
+    Memory-maps a WAD2/WAD3 file, parses its directory and decodes lumps on request.
+
+    Lumps are handed out as `memoryview` slices of the mapping, so decoding a
+    texture doesn't copy its pixels and the OS only pages in what's used.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Path to the WAD file.
+
+        Raises:
+            ValueError: If the file isn't a WAD2 or WAD3 file, or its directory
+                is cut off.
+        """
+        self.path = path
+        self.serial = next(_serials)
+        self.mtime = os.path.getmtime(path)
+        self.data = None  # whole file, once detached
+        self.clients = WeakSet()  # textures that may hold views of the mapping
+        # held while textures decode and while detaching, which can happen on
+        # different threads (GUI, thumbnails, saving)
+        self.lock = threading.Lock()
+
+        if os.path.getsize(path) < HEADER.size:
+            raise ValueError(f"Invalid WAD file: {path}")
+
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+
+        try:
+            magic, count, directory_offset = HEADER.unpack_from(self.view)
+            if magic not in (b"WAD2", b"WAD3"):
+                raise ValueError(f"Invalid WAD file: {path}")
+
+            end = directory_offset + count * ENTRY.size
+            if count < 0 or directory_offset < 0 or end > len(self.view):
+                raise ValueError(f"Truncated WAD directory: {path}")
+
+            # released on the way out, or close() couldn't release the mapping
+            with self.view[directory_offset:end] as directory:
+                self.is_wad3 = magic == b"WAD3"
+                self.entries = [WadEntry(*e) for e in ENTRY.iter_unpack(directory)]
+        except Exception:
+            # nothing else holds on to a reader that failed to open
+            self.close()
+            raise
+
+    def read(self, entry):
+        """
+        Args:
+            entry (WadEntry): Lump to read.
+
+        Returns:
+            memoryview: The raw lump data, without copying it.
+        """
+        return self.view[entry.offset : entry.offset + entry.disk_size]
+
+    def decode(self, entry):
+        """
+        Decodes the first mip level (or the picture) of a lump.
+
+        Args:
+            entry (WadEntry): Lump to decode.
+
+        Returns:
+            tuple: Width, height, pixels and palette of the lump. Pixels and
+                palette are `memoryview` slices of the lump data.
+
+        Raises:
+            ValueError: If the lump isn't a texture or is compressed.
+        """
+        if entry.compression:
+            raise ValueError(f"Compressed lumps aren't supported: {entry.name}")
+
+        data = self.read(entry)
+        palette = QUAKE_PALETTE
+
+        if LUMP_TYPES.get(entry.type) == "MIPTEX":
+            header = MIPTEX_HEADER.unpack_from(data)
+            width, height, offsets = header[1], header[2], header[3:]
+            pixels = data[offsets[0] : offsets[0] + width * height]
+
+            # for WAD3, use embedded palette from miptexture
+            if self.is_wad3:
+                palette_offset = offsets[3] + (width // 8) * (height // 8) + 2
+                palette = data[palette_offset : palette_offset + 768] or palette
+        elif entry.type == QPIC:
+            width, height = QPIC_HEADER.unpack_from(data)
+            pixels = data[QPIC_HEADER.size : QPIC_HEADER.size + width * height]
+
+            if self.is_wad3:
+                palette_offset = QPIC_HEADER.size + width * height + 2
+                palette = data[palette_offset : palette_offset + 768] or palette
+        else:
+            raise ValueError(f"Not a texture lump: {entry.name}")
+
+        if len(pixels) != width * height or len(palette) != 768:
+            raise ValueError(f"Truncated lump: {entry.name}")
+
+        return width, height, pixels, palette
+
+    def info(self, entry):
+        """
+        Reads what's shown about a lump from its header, without decoding it.
+
+        Args:
+            entry (WadEntry): Texture lump.
+
+        Returns:
+            TextureInfo: Size, palette and lump size of the texture, or None
+                if the lump can't be decoded.
+        """
+        if entry.compression or entry.type not in LUMP_TYPES:
+            return None
+
+        data = self.read(entry)
+        try:
+            if entry.type == QPIC:
+                width, height = QPIC_HEADER.unpack_from(data)
+                palette_offset = QPIC_HEADER.size + width * height + 2
+            else:
+                header = MIPTEX_HEADER.unpack_from(data)
+                width, height = header[1], header[2]
+                palette_offset = header[6] + (width // 8) * (height // 8) + 2
+        except struct.error:
+            return None
+
+        # same fallback as decode(), WAD3 lumps without a palette use Quake's
+        palette = "Quake"
+        if self.is_wad3:
+            embedded = data[palette_offset : palette_offset + 768]
+            if len(embedded) == 768 and embedded != QUAKE_PALETTE:
+                palette = "Custom"
+
+        return TextureInfo(
+            width, height, palette, LUMP_TYPES[entry.type], entry.disk_size
+        )
+
+    def textures(self):
+        """
+        Creates textures for every image lump without decoding any pixels.
+
+        Returns:
+            list: Lazily decoded Texture objects, in directory order.
+        """
+        return [
+            Texture(
+                e.name,
+                lump_type=LUMP_TYPES[e.type],
+                source=(self, e),
+                info=self.info(e),
+            )
+            for e in self.entries
+            if e.type in LUMP_TYPES
+        ]
+
+    def track(self, texture):
+        """
+        Registers a texture decoding from this reader, so it can be detached later.
+
+        Args:
+            texture (Texture): Texture with this reader as its source.
+        """
+        self.clients.add(texture)
+
+    def detach(self):
+        """
+        Copies the file into memory and drops the mapping, so textures stay
+        valid after the file on disk is overwritten.
+        """
+        with self.lock:
+            if self.data is not None:
+                return
+
+            self.data = bytes(self.view)
+            for texture in list(self.clients):
+                texture.detach()
+
+            self.close()
+            self.view = memoryview(self.data)
+
+    def close(self):
+        """Releases the mapping, if nothing is still looking at it."""
+        try:
+            self.view.release()
+            self.map.close()
+        except BufferError:
+            # a view is still alive somewhere, the mapping goes away with it
+            pass
+
+
+def open_wad(path):
+    """
+    Returns a reader for `path`, reusing an already open one if the file didn't change.
+
+    Args:
+        path (str): Path to the WAD file.
+
+    Returns:
+        WadReader: Reader for the file.
+    """
+    key = os.path.realpath(path)
+    reader = _readers.get(key)
+
+    if (
+        reader is None
+        or reader.data is not None
+        or (reader.mtime != os.path.getmtime(path))
+    ):
+        reader = WadReader(path)
+        _readers[key] = reader
+
+    return reader
+
+
+def detach_wad(path):
+    """
+    Detaches every open reader of `path`, call this before overwriting the file.
+
+    Args:
+        path (str): Path to the WAD file.
+    """
+    reader = _readers.pop(os.path.realpath(path), None)
+    if reader is not None:
+        reader.detach()
@@ -0,0 +1,127 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=consider-using-with
+import os
+from contextlib import suppress
+
+from utils.wadreader import (
+    HEADER,
+    ENTRY,
+    MIPTEX_HEADER,
+    MIPTEX_HL,
+    MIPTEX_QUAKE,
+    detach_wad,
+)
+
+
+def miptex_lump(name, width, height, levels, palette=None):
+    """
+    Builds a MIPTEX lump in a single preallocated buffer.
+
+    Args:
+        name (str): Texture name, at most 16 ASCII characters.
+        width (int): Width of the first mip level.
+        height (int): Height of the first mip level.
+        levels (list): Pixels of the 4 mip levels, largest first.
+        palette (bytes, optional): 768 bytes of RGB, WAD3 lumps only.
+
+    Returns:
+        bytearray: The lump data.
+    """
+    size = MIPTEX_HEADER.size + sum(len(level) for level in levels)
+    if palette is not None:
+        size += 2 + 768 + 2  # color count, palette, padding
+
+    lump = bytearray(size)
+
+    offsets = []
+    offset = MIPTEX_HEADER.size
+    for level in levels:
+        offsets.append(offset)
+        lump[offset : offset + len(level)] = level
+        offset += len(level)
+
+    MIPTEX_HEADER.pack_into(lump, 0, name.encode("ascii"), width, height, *offsets)
+
+    if palette is not None:
+        lump[offset : offset + 2] = (256).to_bytes(2, "little")
+        lump[offset + 2 : offset + 2 + 768] = palette
+
+    return lump
+
+
+class WadWriter:
+    """
+    Writes a WAD2/WAD3 file one lump at a time.
+
+    Lump data goes straight to disk as it's added, only the directory is kept
+    in memory and written at the end, followed by patching the header. The
+    file is written next to `path` and only replaces it once it's complete.
+    """
+
+    def __init__(self, path, is_wad3=False):
+        """
+        Args:
+            path (str): Output path of the WAD file.
+            is_wad3 (bool, optional): Whether to write a WAD3 file instead of WAD2.
+        """
+        self.path = path
+        self.is_wad3 = is_wad3
+        self.temp_path = f"{path}.tmp"
+        self.directory = []
+
+        self.file = open(self.temp_path, "wb")
+        self.file.write(bytes(HEADER.size))  # patched in close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def add(self, name, data, lump_type=None):
+        """
+        Appends a lump.
+
+        Args:
+            name (str or bytes): Lump name, at most 16 ASCII characters, or
+                the 16 bytes of a name copied as is from another WAD.
+            data (bytes-like or list): Lump data, or a list of chunks making it up.
+            lump_type (int, optional): Directory lump type. Defaults to the
+                MIPTEX type of the WAD version.
+        """
+        if lump_type is None:
+            lump_type = MIPTEX_HL if self.is_wad3 else MIPTEX_QUAKE
+        if isinstance(name, str):
+            name = name.encode("ascii")
+
+        offset = self.file.tell()
+        for chunk in data if isinstance(data, list) else [data]:
+            self.file.write(chunk)
+        size = self.file.tell() - offset
+
+        self.directory.append(ENTRY.pack(offset, size, size, lump_type, 0, name))
+
+    def close(self):
+        """Writes the directory, patches the header and moves the file in place."""
+        directory_offset = self.file.tell()
+        self.file.write(b"".join(self.directory))
+
+        self.file.seek(0)
+        magic = b"WAD3" if self.is_wad3 else b"WAD2"
+        self.file.write(HEADER.pack(magic, len(self.directory), directory_offset))
+        self.file.close()
+
+        # textures might still be reading from the file we're about to replace
+        detach_wad(self.path)
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        """Throws away the partially written file."""
+        self.file.close()
+
+        # don't let a missing temp file hide the error that got us here
+        with suppress(OSError):
+            os.remove(self.temp_path)
@@ -0,0 +1,113 @@
+# pylint: disable=invalid-name
+# pylint: disable=missing-module-docstring
+# pylint: disable=broad-exception-caught
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+    QPushButton,
+    QLabel,
+    QFileDialog,
+    QMessageBox,
+)
+
+from utils import profiling
+
+
+class PerformanceWindow(QDialog):
+    """
+    Live view of the timing spans recorded by utils.profiling, with a way to
+    save them as a Chrome trace.
+    """
+
+    COLUMNS = ["Span", "Count", "Total (ms)", "Mean (ms)", "Max (ms)"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Performance")
+        self.resize(640, 420)
+
+        self.table = QTableWidget(0, len(self.COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+
+        self.summary = QLabel(self)
+
+        clear_button = QPushButton("&Clear", self)
+        clear_button.clicked.connect(self.clear)
+        trace_button = QPushButton("Save &Trace...", self)
+        trace_button.clicked.connect(self.save_trace)
+        close_button = QPushButton("Close", self)
+        close_button.clicked.connect(self.accept)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.summary)
+        buttons.addStretch()
+        buttons.addWidget(clear_button)
+        buttons.addWidget(trace_button)
+        buttons.addWidget(close_button)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.table)
+        layout.addLayout(buttons)
+
+        # live, spans keep coming in while the dialog is open
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000)
+
+        self.refresh()
+
+    def refresh(self):
+        """Fills the table with the current span totals."""
+        rows = profiling.stats()
+
+        self.table.setRowCount(len(rows))
+        for row, (name, count, total, mean, longest) in enumerate(rows):
+            cells = [
+                name,
+                str(count),
+                f"{total * 1000:.1f}",
+                f"{mean * 1000:.2f}",
+                f"{longest * 1000:.1f}",
+            ]
+            for column, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if column:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+        self.summary.setText(
+            f"{len(profiling.spans())}/{profiling.BUFFER_SIZE} spans buffered"
+        )
+
+    def clear(self):
+        """Forgets every recorded span."""
+        profiling.clear()
+        self.refresh()
+
+    def save_trace(self):
+        """Asks for a path and writes the buffered spans as a Chrome trace."""
+        out_path, _ = QFileDialog.getSaveFileName(
+            self, "Save Trace", "qthon-trace.json", "Chrome Trace (*.json)"
+        )
+        if not out_path:
+            return
+
+        try:
+            count = profiling.chrome_trace(out_path)
+            QMessageBox.information(
+                self,
+                "Trace Saved",
+                f"Saved {count} spans to {out_path}.\n"
+                "Open it in chrome://tracing or ui.perfetto.dev.",
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Couldn't save the trace: {e}")
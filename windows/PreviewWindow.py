@@ -4,27 +4,26 @@
 # pylint: disable=missing-module-docstring
 # pylint: disable=missing-function-docstring
 # pylint: disable=too-many-locals
-import os
-
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel
 from PyQt5.QtGui import QPixmap, QImage
 from PyQt5.QtCore import QTimer, Qt
-from PIL import Image
 
 
 class PreviewWindow(QDialog):
-    def __init__(self, texture, max_dimension=100, animated=False):
+    def __init__(self, texture, max_dimension=100, animated=False, textures=None):
         super().__init__()
         self.setWindowTitle("Preview texture - Qthon")
         self.setMinimumSize(500, 300)
         layout = QVBoxLayout()
 
-        filename = os.path.basename(texture)
+        filename = texture.name
 
         if filename.startswith("+") and animated:
             # animation textures
             self.frame_index = 0
-            self.frames = self.load_animation_frames(texture, max_dimension)
+            self.frames = self.load_animation_frames(
+                texture, textures or {}, max_dimension
+            )
 
             self.animation_label = QLabel()
             self.animation_label.setAlignment(Qt.AlignLeft | Qt.AlignTop)
@@ -50,7 +49,7 @@ class PreviewWindow(QDialog):
     def generate_mipmaps(self, texture, max_dimension=200):
         mipmaps = []
 
-        img = Image.open(texture)
+        img = texture.to_image()
 
         # calc new dimensions
         width, height = img.size
@@ -82,17 +81,16 @@ class PreviewWindow(QDialog):
         return mipmaps
 
     # ANIMATION
-    def load_animation_frames(self, texture_path, max_dimension=200):
+    def load_animation_frames(self, texture, textures, max_dimension=200):
         frames = []
 
-        temp_dir = os.path.dirname(texture_path)
-        frames_name = os.path.basename(texture_path)
+        frames_name = texture.name
 
         # find other frames
-        animation_paths = []
+        animation_names = []
 
-        animation_paths.append(texture_path)
-        for filename in os.listdir(temp_dir):
+        animation_names.append(frames_name)
+        for filename in textures:
             if (
                 len(filename) == len(frames_name)
                 and filename[1] != frames_name[1]
@@ -102,14 +100,17 @@ class PreviewWindow(QDialog):
                     if i != 1
                 )
             ):
-                animation_paths.append(os.path.join(temp_dir, filename))
+                animation_names.append(filename)
 
         # sort them
-        animation_paths.sort()
+        animation_names.sort()
 
         # load them & scale
-        for frame_path in animation_paths:
-            img = Image.open(frame_path)
+        for frame_name in animation_names:
+            if frame_name == frames_name:
+                img = texture.to_image()
+            else:
+                img = textures[frame_name].to_image()
 
             # calc new size
             width, height = img.size
@@ -11,13 +11,13 @@ from utils import path
 
 
 class RenameWindow(QDialog):
-    def __init__(self, texture_title, texture_path):
+    def __init__(self, texture_title, texture_name):
         super().__init__()
         uic.loadUi(path("assets", "ui", "rename.ui"), self)
         # yes, I'd rather create a whole .ui file than code out 2 items widget
 
         self.title = texture_title
-        self.path = texture_path
+        self.name = texture_name
 
         self.lineEdit.setText(self.title)
 
@@ -2,14 +2,13 @@
 # pylint: disable=missing-class-docstring
 # pylint: disable=unnecessary-lambda
 # pylint: disable=invalid-name
-from PIL import Image
-
 from PyQt5 import uic
 from PyQt5.QtWidgets import (
     QDialog,
 )
 
 from utils import path
+from utils.resize import FILTERS, power_of_two
 
 
 class ResizeWindow(QDialog):
@@ -18,13 +17,19 @@ class ResizeWindow(QDialog):
         uic.loadUi(path("assets", "ui", "resize.ui"), self)
 
         self.textures = textures
-        self.x, self.y = Image.open(textures[0]["path"]).size
+        self.x, self.y = textures[0].info.width, textures[0].info.height
         self.sb_X.setValue(self.x)
         self.sb_Y.setValue(self.y)
 
         self.sb_X.lineEdit().setReadOnly(True)
         self.sb_Y.lineEdit().setReadOnly(True)
 
+        # nearest keeps the palette indices as they are, like before filters existed
+        self.cb_filter.addItems(FILTERS)
+        self.cb_filter.setCurrentText("Nearest")
+
+        self.cb_pow2.toggled.connect(lambda checked: self.set_size_enabled(not checked))
+
         self.sb_X.valueChanged.connect(lambda: self.spinbox_constrain())
         self.sb_Y.valueChanged.connect(lambda: self.spinbox_constrain())
 
@@ -37,11 +42,29 @@ class ResizeWindow(QDialog):
             other_spinbox = self.sb_X if sender == self.sb_Y else self.sb_Y
             other_spinbox.setValue(sender.value())
 
+    def set_size_enabled(self, enabled):
+        self.sb_X.setEnabled(enabled)
+        self.sb_Y.setEnabled(enabled)
+        self.cb_constrain.setEnabled(enabled)
+
     def ok_clicked(self):
-        for t in self.textures:
-            img = Image.open(t["path"])
-            resized = img.resize((self.sb_X.value(), self.sb_Y.value()))
+        # resizing itself happens on the worker pool, see EditMixin.resize_texture
+        self.accept()
 
-            resized.save(t["path"])
+    def get_sizes(self):
+        """
+        Returns:
+            list: The new width and height of every texture.
+        """
+        if self.cb_pow2.isChecked():
+            # sizes from the lump headers, so unopened textures aren't decoded here
+            return [
+                (power_of_two(t.info.width), power_of_two(t.info.height))
+                for t in self.textures
+            ]
 
-        self.accept()
+        return [(self.sb_X.value(), self.sb_Y.value())] * len(self.textures)
+
+    def get_filter(self):
+        """Returns the name of the chosen resampling filter."""
+        return self.cb_filter.currentText()